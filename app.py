@@ -1,20 +1,42 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import time
+
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, render_template, request, jsonify, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
-import json
 from datetime import datetime
 
+from models.submission_store import empty_document, get_store
+from utils.export import export_response, parse_export_query
+from utils.jobs import get_job_queue
+from utils.listing import fetch_page, ndjson_response, parse_listing_query
+from utils.metrics import (REQUEST_BYTES, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, RESPONSE_BYTES,
+                           render_registry)
+from utils.profiling import RequestProfiler, TimedJSONProvider, phase
+from utils.request_limits import MAX_CONTENT_LENGTH, enforce_request_limits
+from utils.response_cache import cached_response, response_cache, submissions_version
+from utils.static_assets import StaticAssets
 from controllers.contact_controller import contact_bp
 from controllers.services_controller import services_bp
 from controllers.training_controller import training_bp
 
 app = Flask(__name__, static_folder='.', template_folder='.')
+app.json = TimedJSONProvider(app)
 CORS(app)
 
 app.config['SECRET_KEY'] = 'nirmaanify-secret-key-2025'
 app.config['JSON_AS_ASCII'] = False
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-DATA_FILE = 'data/submissions.json'
+# Behind Render's (or any) reverse proxy, trust that many X-Forwarded-For hops for the client IP.
+PROXY_COUNT = int(os.environ.get('PROXY_COUNT', 0))
+if PROXY_COUNT:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_COUNT, x_proto=PROXY_COUNT)
+
+request_profiler = RequestProfiler()
+static_assets = StaticAssets(app.root_path, os.path.join(app.root_path, os.environ.get('STATIC_BUILD_DIR', 'static_build')))
 
 app.register_blueprint(contact_bp, url_prefix='/api')
 app.register_blueprint(services_bp, url_prefix='/api')
@@ -26,56 +48,106 @@ try:
 except Exception as e:
     print(f"FAQ endpoints disabled: {e}")
 
-os.makedirs('data', exist_ok=True)
-if not os.path.exists(DATA_FILE):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'contacts': [], 'services': [], 'internships': []}, f, ensure_ascii=False, indent=2)
-
-def load_data():
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {'contacts': [], 'services': [], 'internships': []}
+# Measured up to here: imports, app setup and blueprint registration. The FAQ
+# index and submission store are loaded on first use (or by wsgi.py).
+STARTUP = {'import_ms': round((time.perf_counter() - _import_started) * 1000, 2), 'pid': os.getpid()}
+print(f"App imported in {STARTUP['import_ms']} ms")
+
+def metrics_endpoint():
+    rule = request.url_rule
+    return rule.rule if rule is not None else '<unmatched>'
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+    if request.content_length:
+        REQUEST_BYTES.observe(request.content_length, request.method, metrics_endpoint())
+    request_profiler.start()
+
+app.before_request(enforce_request_limits)
+
+@app.after_request
+def record_request_metrics(response):
+    response = request_profiler.finish(response)
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = metrics_endpoint()
+        status = str(response.status_code)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, endpoint, status)
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, request.method, endpoint, status)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    request_profiler.abandon()
+    if g.pop('request_started', None) is not None:
+        REQUESTS_IN_FLIGHT.dec()
 
 def get_database_stats():
-    data = load_data()
+    with phase('store'):
+        aggregates = get_store().aggregates()
     return {
-        'total_contacts': len(data.get('contacts', [])),
-        'total_services': len(data.get('services', [])),
-        'total_internships': len(data.get('internships', [])),
-        'total_submissions': len(data.get('contacts', [])) + len(data.get('services', [])) + len(data.get('internships', []))
+        'total_contacts': aggregates.total('contacts'),
+        'total_services': aggregates.total('services'),
+        'total_internships': aggregates.total('internships'),
+        'total_submissions': aggregates.total('contacts') + aggregates.total('services') + aggregates.total('internships')
     }
 
 @app.route('/')
 def index():
-    return send_from_directory('.', 'index.html')
+    return static_assets.send('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
-    return send_from_directory('.', filename)
+    return static_assets.send(filename)
 
 @app.route('/api/health')
 def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Nirmaanify API is running',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'submission_cache': get_store().cache_stats(),
+        'response_cache': response_cache.stats(),
+        'jobs': get_job_queue().stats(),
+        'startup': STARTUP
     })
 
+@app.route('/api/metrics')
+def metrics():
+    return Response(render_registry(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/submissions')
 def get_submissions():
     try:
-        data = load_data()
+        store = get_store()
+        try:
+            query = parse_listing_query(request.args)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        if query.stream:
+            return ndjson_response(store, query)
+
+        page, next_cursor = fetch_page(store, query)
+        data = empty_document()
+        for collection, record in page:
+            data[collection].append(record)
+        aggregates = store.aggregates()
         
         return jsonify({
             'success': True,
             'data': data,
             'counts': {
-                'contacts': len(data.get('contacts', [])),
-                'services': len(data.get('services', [])),
-                'internships': len(data.get('internships', []))
-            }
+                'contacts': aggregates.total('contacts'),
+                'services': aggregates.total('services'),
+                'internships': aggregates.total('internships')
+            },
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({
@@ -83,7 +155,19 @@ def get_submissions():
             'error': str(e)
         }), 500
 
+@app.route('/api/submissions/export')
+def export_submissions():
+    try:
+        query, fmt, gzip = parse_export_query(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    return export_response(get_store(), query, fmt, gzip)
+
 @app.route('/api/stats')
+@cached_response(submissions_version)
 def get_stats():
     try:
         stats = get_database_stats()
@@ -105,6 +189,14 @@ def not_found(error):
         'message': 'The requested endpoint does not exist'
     }), 404
 
+@app.errorhandler(413)
+def payload_too_large(error):
+    return jsonify({
+        'success': False,
+        'error': 'Request too large',
+        'message': f'Request bodies are limited to {MAX_CONTENT_LENGTH} bytes'
+    }), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({
@@ -0,0 +1,239 @@
+"""Latency and throughput of every API route on synthetic data.
+
+Usage:
+  python benchmarks/bench_api.py [--submissions 10000] [--faqs 1000] [--requests 200] [--out results.json]
+  python benchmarks/bench_api.py --generate DIR [--submissions N] [--faqs N]   # data for a real server
+  python benchmarks/bench_api.py --url http://localhost:5000 [--requests 200]
+  python benchmarks/bench_api.py --baseline old.json [...]                      # print p50 changes
+
+By default the app runs in-process on the Flask test client with a generated
+``submissions.json`` (``--submissions`` records per collection) and
+``faqs.json``. With --url, run --generate first and start the server with
+``DATA_DIR=DIR FAQ_FILE=DIR/faqs.json RATE_LIMIT_ENABLED=0``. Results are
+written as JSON so later runs can be compared with --baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import (CATEGORIES, WORDS, HTTPTransport, TestClientTransport,  # noqa: E402
+                               synthetic_faqs, synthetic_submissions)
+
+CONTACT_FORM = {'name': 'Bench User', 'email': 'bench@example.com', 'subject': 'general',
+                'message': 'Hello, I have a question about your services.'}
+SERVICE_FORM = {'name': 'Bench User', 'email': 'bench@example.com', 'service': 'web-development',
+                'project-details': 'A small company website with a contact form.', 'budget': '50k-1l'}
+TRAINING_FORM = {'name': 'Bench User', 'email': 'bench@example.com', 'phone': '9999999999',
+                 'area': 'web-development', 'skills': 'HTML, CSS, JavaScript', 'duration': '3-months',
+                 'motivation': 'I want to build real projects.'}
+
+
+def generate(data_dir, submissions, faqs):
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'submissions.json'), 'w', encoding='utf-8') as f:
+        json.dump(synthetic_submissions(submissions), f)
+    with open(os.path.join(data_dir, 'faqs.json'), 'w', encoding='utf-8') as f:
+        json.dump(synthetic_faqs(faqs), f)
+
+
+def routes():
+    """(name, method, path, body) for every route, grouped by blueprint."""
+    return [
+        ('contact_bp POST /api/contact', 'POST', '/api/contact', CONTACT_FORM),
+        ('contact_bp GET /api/contact', 'GET', '/api/contact?limit=100', None),
+        ('contact_bp GET /api/contact/<id>', 'GET', '/api/contact/contact_bench_{n}', None),
+        ('services_bp POST /api/services', 'POST', '/api/services', SERVICE_FORM),
+        ('services_bp GET /api/services', 'GET', '/api/services?limit=100', None),
+        ('services_bp GET /api/services/<id>', 'GET', '/api/services/service_bench_{n}', None),
+        ('services_bp GET /api/services/stats', 'GET', '/api/services/stats', None),
+        ('training_bp POST /api/training', 'POST', '/api/training', TRAINING_FORM),
+        ('training_bp GET /api/training', 'GET', '/api/training?limit=100', None),
+        ('training_bp GET /api/training/<id>', 'GET', '/api/training/internship_bench_{n}', None),
+        ('training_bp GET /api/training/stats', 'GET', '/api/training/stats', None),
+        ('training_bp GET /api/training/areas', 'GET', '/api/training/areas', None),
+        ('faq_bp POST /api/faq/search', 'POST', '/api/faq/search', {'query': '{query}'}),
+        ('faq_bp POST /api/faq/search/batch', 'POST', '/api/faq/search/batch',
+         {'queries': ['{query}', '{prefix}', '{category}']}),
+        ('faq_bp GET /api/faq/autocomplete', 'GET', '/api/faq/autocomplete?q={prefix_q}', None),
+        ('faq_bp GET /api/faq/all', 'GET', '/api/faq/all', None),
+        ('faq_bp GET /api/faq/category/<c>', 'GET', '/api/faq/category/{category}', None),
+        ('faq_bp GET /api/faq/health', 'GET', '/api/faq/health', None),
+        ('app GET /', 'GET', '/', None),
+        ('app GET /api/health', 'GET', '/api/health', None),
+        ('app GET /api/stats', 'GET', '/api/stats', None),
+        ('app GET /api/submissions', 'GET', '/api/submissions?limit=100', None),
+        ('app GET /api/submissions/export', 'GET', '/api/submissions/export?type=contacts&format=csv', None),
+        ('app GET /api/metrics', 'GET', '/api/metrics', None),
+    ]
+
+
+def fill(template, rng, submissions):
+    values = {
+        'n': rng.randrange(max(submissions, 1)),
+        'query': ' '.join(rng.choices(WORDS, k=rng.randint(1, 4))),
+        'prefix': ' '.join(rng.choices(WORDS, k=rng.randint(0, 2)) + [rng.choice(WORDS)[:rng.randint(1, 4)]]),
+        'category': rng.choice(CATEGORIES)
+    }
+    values['prefix_q'] = urllib.parse.quote(values['prefix'])
+    if isinstance(template, dict):
+        return {key: value.format(**values) if isinstance(value, str)
+                else [item.format(**values) for item in value] if isinstance(value, list) else value
+                for key, value in template.items()}
+    return template.format(**values)
+
+
+def measure(transport, method, path, body, requests, concurrency, submissions, warmup=5):
+    rng = random.Random(17)
+    for _ in range(warmup):
+        transport.request(method, fill(path, rng, submissions), fill(body, rng, submissions) if body else None)
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    per_thread = max(1, requests // concurrency)
+
+    def worker(seed):
+        worker_rng = random.Random(seed)
+        local_latencies = []
+        local_statuses = {}
+        for _ in range(per_thread):
+            url = fill(path, worker_rng, submissions)
+            payload = fill(body, worker_rng, submissions) if body else None
+            start = time.perf_counter()
+            status = transport.request(method, url, payload)
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[str(status)] = local_statuses.get(str(status), 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000,
+        'statuses': statuses
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['routes']
+    print(f"\n{'route':<42} {'base p50':>9} {'p50':>9} {'change':>8}")
+    for name, result in results['routes'].items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+        print(f"{name:<42} {old['p50_ms']:>9.2f} {result['p50_ms']:>9.2f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--submissions', type=int, default=10000, help='synthetic records per collection')
+    parser.add_argument('--faqs', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--url', help='benchmark a running server instead of the test client')
+    parser.add_argument('--generate', metavar='DIR', help='only write the synthetic data files into DIR')
+    parser.add_argument('--only', help='comma separated substrings; run matching routes only')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'benchmarks', 'results', 'bench_api.json'))
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.generate, args.submissions, args.faqs)
+        print(f'Wrote {args.submissions} submissions per collection and {args.faqs} FAQs to {args.generate}')
+        return
+
+    workdir = None
+    if args.url:
+        transport = HTTPTransport(args.url)
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        generate(workdir.name, args.submissions, args.faqs)
+        os.environ['DATA_DIR'] = workdir.name
+        os.environ['FAQ_FILE'] = os.path.join(workdir.name, 'faqs.json')
+        os.environ.setdefault('NOTIFICATION_SINK', 'stub')
+        os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+        os.chdir(ROOT)
+        start = time.perf_counter()
+        from app import app
+        from models.submission_store import get_store
+        get_store().aggregates()
+        print(f'App ready in {time.perf_counter() - start:.2f}s')
+        transport = TestClientTransport(app)
+
+    selected = routes()
+    if args.only:
+        patterns = args.only.split(',')
+        selected = [route for route in selected if any(p in route[0] for p in patterns)]
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': args.url or 'test_client',
+            'submissions_per_collection': args.submissions,
+            'faqs': args.faqs,
+            'requests': args.requests,
+            'concurrency': args.concurrency
+        },
+        'routes': {}
+    }
+    print(f"{'route':<42} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}  statuses")
+    for name, method, path, body in selected:
+        result = measure(transport, method, path, body, args.requests, args.concurrency, args.submissions)
+        results['routes'][name] = result
+        print(f"{name:<42} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f}  {result['statuses']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {args.out}')
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Cold start: time to import the app and to answer the first FAQ searches.
+
+Usage: python benchmarks/bench_cold_start.py [--runs 5] [--faqs N]
+
+Every run is a fresh interpreter, so nothing is warm except the OS page
+cache. Each configuration reports the median of ``--runs`` for importing
+``app``, the first keyword search (loads the FAQ index) and the first
+hybrid search (loads numpy and the dense index). "json" builds the indexes
+from ``faqs.json``; "snapshot" loads them from
+``scripts/build_faq_snapshot.py`` output. With --faqs, a synthetic FAQ file
+of that size is used instead of ``data/faqs.json``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import synthetic_faqs  # noqa: E402
+
+CHILD = r'''
+import json, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+client = app.test_client()
+client.post('/api/faq/search', json={'query': 'internship duration', 'mode': 'keyword'})
+keyword = time.perf_counter()
+client.post('/api/faq/search', json={'query': 'project cost estimate', 'mode': 'hybrid'})
+hybrid = time.perf_counter()
+health = client.get('/api/faq/health').get_json()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_keyword_ms': (keyword - imported) * 1000,
+    'first_hybrid_ms': (hybrid - keyword) * 1000,
+    'loaded_from': health['loaded_from'],
+}))
+'''
+
+
+def run_child(env):
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--faqs', type=int, help='use a synthetic FAQ file with this many entries')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        faq_file = os.path.join(ROOT, 'data', 'faqs.json')
+        if args.faqs:
+            faq_file = os.path.join(workdir, 'faqs.json')
+            with open(faq_file, 'w', encoding='utf-8') as f:
+                json.dump(synthetic_faqs(args.faqs), f)
+        snapshot_dir = os.path.join(workdir, 'faq_index')
+        subprocess.run([sys.executable, os.path.join(ROOT, 'scripts', 'build_faq_snapshot.py'),
+                        '--faqs', faq_file, '--out', snapshot_dir], check=True, capture_output=True)
+
+        env = dict(os.environ, DATA_DIR=workdir, FAQ_FILE=faq_file, NOTIFICATION_SINK='stub',
+                   RATE_LIMIT_ENABLED='0', PYTHONDONTWRITEBYTECODE='1')
+        configs = [
+            ('json', dict(env, FAQ_SNAPSHOT_DIR=os.path.join(workdir, 'missing'))),
+            ('snapshot', dict(env, FAQ_SNAPSHOT_DIR=snapshot_dir)),
+        ]
+        print(f"{'index from':<10} {'import ms':>10} {'1st keyword':>12} {'1st hybrid':>11}")
+        for name, config_env in configs:
+            runs = [run_child(config_env) for _ in range(args.runs)]
+            assert all(r['loaded_from'] == name for r in runs), runs
+            medians = [statistics.median(r[key] for r in runs)
+                       for key in ('import_ms', 'first_keyword_ms', 'first_hybrid_ms')]
+            print(f'{name:<10} {medians[0]:>10.1f} {medians[1]:>12.1f} {medians[2]:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
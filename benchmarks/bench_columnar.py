@@ -0,0 +1,167 @@
+"""Memory and speed of the log store's columnar tables against a list of dicts.
+
+Usage: python benchmarks/bench_columnar.py [--submissions 30000] [--repeat 5]
+
+"dicts" is how the log store used to hold submissions: every record parsed
+from its log line and kept as a dict, with ``SubmissionAggregates`` counters
+next to them. "columnar" is ``models/columnar.py``: a ``RecordTable`` per
+collection with the stats answered by ``ColumnarAggregates``, filters run
+by ``RecordTable.select`` and export rows read by ``RecordTable.rows``.
+Lookups repeat the same IDs, as an admin paging through submissions does,
+so the columnar side is served from the decoded-row cache. Memory is the
+tracemalloc size of everything built from the decoded lines; the timings
+are the median of ``--repeat`` runs.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import synthetic_submissions  # noqa: E402
+from models.aggregates import DISTRIBUTIONS, SubmissionAggregates  # noqa: E402
+from models.columnar import ColumnarAggregates, RecordTable  # noqa: E402
+from utils import json_codec  # noqa: E402
+from utils.listing import ListingQuery  # noqa: E402
+
+
+def encoded_lines(document):
+    return {collection: [json_codec.dumps(record) for record in records]
+            for collection, records in document.items()}
+
+
+def build_dicts(lines):
+    document = {collection: [json_codec.loads(line) for line in collection_lines]
+                for collection, collection_lines in lines.items()}
+    return document, SubmissionAggregates(document)
+
+
+def build_columnar(lines):
+    tables = {}
+    for collection, collection_lines in lines.items():
+        table = tables[collection] = RecordTable()
+        for line in collection_lines:
+            table.append(json_codec.loads(line))
+    return tables, ColumnarAggregates(tables, threading.Lock())
+
+
+def measure_memory(build, lines):
+    tracemalloc.start()
+    built = build(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return size
+
+
+def timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def distributions_from_dicts(document):
+    # What the stats would cost without counters: one pass over the records per distribution.
+    counts = {}
+    for collection, field, _ in DISTRIBUTIONS:
+        counter = counts[f'{collection}.{field}'] = {}
+        for record in document[collection]:
+            value = record.get('data', {}).get(field)
+            counter[value] = counter.get(value, 0) + 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--submissions', type=int, default=30000, help='synthetic records per collection')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lines = encoded_lines(synthetic_submissions(args.submissions))
+    total = sum(len(collection_lines) for collection_lines in lines.values())
+    document, dict_aggregates = build_dicts(lines)
+    tables, columnar_aggregates = build_columnar(lines)
+    ids = [record['id'] for records in document.values() for record in records][::97]
+    index = {record['id']: (collection, position)
+             for collection, records in document.items() for position, record in enumerate(records)}
+
+    def iterate_dicts():
+        for records in document.values():
+            for record in records:
+                record['data']
+
+    def iterate_columnar():
+        for table in tables.values():
+            for position in range(len(table)):
+                table.record(position)['data']
+
+    def lookup_dicts():
+        for submission_id in ids:
+            collection, position = index[submission_id]
+            document[collection][position]
+
+    def lookup_columnar():
+        for submission_id in ids:
+            collection, position = index[submission_id]
+            tables[collection].cached_record(position)
+
+    by_service = ListingQuery(tuple(document), None, None, None, None, {'service': 'consulting'}, True)
+    by_day = ListingQuery(tuple(document), None, None, '2025-12-01', None, {}, True)
+
+    def filter_dicts(query):
+        for records in document.values():
+            [record for record in records if query.matches(record)]
+
+    def filter_columnar(query):
+        for table in tables.values():
+            [table.record(position) for position in table.select(query)]
+
+    fields = {collection: list(records[0]['data']) if records else [] for collection, records in document.items()}
+
+    def rows_dicts():
+        for collection, records in document.items():
+            for record in records:
+                data = record.get('data', {})
+                ((record.get('id'), record.get('type'), record.get('timestamp'))
+                 + tuple(data.get(field) for field in fields[collection]))
+
+    def rows_columnar():
+        for collection, table in tables.items():
+            for _ in table.rows(range(len(table)), fields[collection]):
+                pass
+
+    rows = [
+        ('memory (MB)', measure_memory(build_dicts, lines) / 2 ** 20,
+         measure_memory(build_columnar, lines) / 2 ** 20),
+        ('load from log lines (ms)', timed(lambda: build_dicts(lines), args.repeat),
+         timed(lambda: build_columnar(lines), args.repeat)),
+        ('iterate every record (ms)', timed(iterate_dicts, args.repeat), timed(iterate_columnar, args.repeat)),
+        (f'{len(ids)} lookups by id (ms)', timed(lookup_dicts, args.repeat), timed(lookup_columnar, args.repeat)),
+        ('filter data.service (ms)', timed(lambda: filter_dicts(by_service), args.repeat),
+         timed(lambda: filter_columnar(by_service), args.repeat)),
+        ('filter since (ms)', timed(lambda: filter_dicts(by_day), args.repeat),
+         timed(lambda: filter_columnar(by_day), args.repeat)),
+        ('export rows (ms)', timed(rows_dicts, args.repeat), timed(rows_columnar, args.repeat)),
+        ('distributions, full scan (ms)', timed(lambda: distributions_from_dicts(document), args.repeat),
+         timed(lambda: {f'{c}.{f}': tables[c].value_counts(f) for c, f, _ in DISTRIBUTIONS}, args.repeat)),
+        ('stats snapshot (ms)', timed(dict_aggregates.snapshot, args.repeat),
+         timed(columnar_aggregates.snapshot, args.repeat)),
+    ]
+    assert dict_aggregates.snapshot() == columnar_aggregates.snapshot()
+
+    print(f'{total} submissions ({args.submissions} per collection)')
+    print(f"{'':<32} {'dicts':>10} {'columnar':>10} {'ratio':>7}")
+    for name, dicts, columnar in rows:
+        print(f'{name:<32} {dicts:>10.2f} {columnar:>10.2f} {dicts / columnar if columnar else 0:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
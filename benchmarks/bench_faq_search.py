@@ -0,0 +1,184 @@
+"""FAQ search: relevance on data/faqs.json and latency on synthetic corpora.
+
+Compares the BM25 inverted index with the previous linear Jaccard scan and,
+when NumPy is installed, the dense and hybrid modes. The "prefix" rows time
+autocomplete on questions that also start with common words like "what is".
+"typed" is every other keystroke of a question being typed out. "nomatch"
+is common words followed by a word no FAQ has. "common" is common words
+followed by a short prefix.
+
+Usage: python benchmarks/bench_faq_search.py [--sizes 10000,100000] [--queries 200]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import synthetic_faqs, synthetic_vocabulary  # noqa: E402
+from models.faq_index import NUMPY_AVAILABLE, DenseFAQIndex, FAQIndex, PrefixIndex, hybrid_search  # noqa: E402
+
+# (query, ids of the FAQs acceptable at rank one)
+JUDGEMENTS = [
+    ('what services do you offer', 1),
+    ('internship', (2, 6, 10)),
+    ('how do I join the internship program', 2),
+    ('which technologies do you use for web development', 3),
+    ('react python nodejs', 3),
+    ('pricing', 4),
+    ('how much does training cost', 4),
+    ('do I get a certificate', 5),
+    ('certification after completion', 5),
+    ('how long is the internship', 6),
+    ('duration of internship', 6),
+    ('real projects hands-on experience', 7),
+    ('contact', 8),
+    ('business inquiry email phone', 8),
+    ('what makes you different', 9),
+    ('remote internship', 10),
+    ('can I work from home', 10),
+]
+
+
+def legacy_search(faqs, query, top_k=3, threshold=0.1):
+    def preprocess(text):
+        return re.sub(r'[^a-zA-Z0-9\s]', '', text.lower()).strip()
+
+    def similarity(query, text):
+        query_words = set(preprocess(query).split())
+        text_words = set(preprocess(text).split())
+        if not query_words or not text_words:
+            return 0
+        return len(query_words & text_words) / len(query_words | text_words)
+
+    results = []
+    for faq in faqs:
+        combined_text = f"{faq['question']} {faq['answer']} {' '.join(faq.get('keywords', []))}"
+        score = similarity(query, combined_text)
+        if score > threshold:
+            results.append((score, faq))
+    results.sort(key=lambda x: x[0], reverse=True)
+    return [faq for _, faq in results[:top_k]]
+
+
+def index_search(index, faqs, query, top_k=3, threshold=0.1):
+    return [faqs[doc_id] for doc_id, _ in index.search(query, top_k=top_k, threshold=threshold)]
+
+
+def engines(faqs, threshold):
+    index = FAQIndex(faqs)
+    found = {
+        'legacy': lambda q: legacy_search(faqs, q, threshold=threshold),
+        'index': lambda q: index_search(index, faqs, q, threshold=threshold),
+    }
+    if NUMPY_AVAILABLE:
+        dense = DenseFAQIndex(faqs)
+        found['dense'] = lambda q: index_search(dense, faqs, q, threshold=threshold)
+        found['hybrid'] = lambda q: [faqs[doc_id] for doc_id, _ in
+                                     hybrid_search(index, dense, q, threshold=threshold)]
+    return found
+
+
+def relevance(faqs):
+    searches = engines(faqs, threshold=0.1)
+    print(f"{'query':<52} {'expected':>8} " + ' '.join(f'{name:>7}' for name in searches))
+    hits = dict.fromkeys(searches, 0)
+    for query, expected in JUDGEMENTS:
+        expected = expected if isinstance(expected, tuple) else (expected,)
+        tops = {}
+        for name, search in searches.items():
+            results = search(query)
+            tops[name] = results[0]['id'] if results else None
+            hits[name] += tops[name] in expected
+        expected_text = '/'.join(str(faq_id) for faq_id in expected)
+        print(f'{query:<52} {expected_text:>8} ' + ' '.join(f'{str(top):>7}' for top in tops.values()))
+    total = len(JUDGEMENTS)
+    print('top-1 accuracy: ' + ', '.join(f'{name} {count}/{total}' for name, count in hits.items()))
+    return hits
+
+
+def synthetic_corpus(size, seed=7):
+    rng = random.Random(seed)
+    vocabulary = synthetic_vocabulary(20000)
+    faqs = synthetic_faqs(size, seed, vocabulary, ['synthetic'])['faqs']
+    queries = [' '.join(rng.choices(vocabulary, k=rng.randint(1, 4))) for _ in range(1000)]
+    return faqs, queries
+
+
+QUESTION_WORDS = ['what', 'is', 'the', 'how', 'do', 'you', 'can', 'i', 'a', 'to', 'of', 'for']
+
+
+def with_question_words(faqs, seed=7):
+    # Synthetic questions share no words; real ones nearly all start with a few common ones.
+    rng = random.Random(seed)
+    return [dict(faq, question=' '.join(rng.sample(QUESTION_WORDS, 3)) + ' ' + faq['question']) for faq in faqs]
+
+
+def completion_inputs(faqs, count, seed=7):
+    rng = random.Random(seed)
+    typed = [faq['question'][:end] for faq in rng.sample(faqs, count)
+             for end in range(1, len(faq['question']), 2)]
+    nomatch = [f"{' '.join(rng.sample(QUESTION_WORDS, rng.randint(1, 3)))} zz{i}" for i in range(count)]
+    common = [f"{' '.join(rng.sample(QUESTION_WORDS, rng.randint(1, 3)))} {rng.choice('abcdeft')}"
+              for _ in range(count)]
+    return {'typed': typed, 'nomatch': nomatch, 'common': common}
+
+
+def time_queries(search, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--legacy-queries', type=int, default=20,
+                        help='the linear scan is slow; time it on fewer queries')
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'data', 'faqs.json'), 'r', encoding='utf-8') as f:
+        relevance(json.load(f)['faqs'])
+    print()
+
+    print(f"{'engine':<15} {'faqs':>8} {'build s':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        faqs, queries = synthetic_corpus(size)
+        start = time.perf_counter()
+        index = FAQIndex(faqs)
+        build = time.perf_counter() - start
+        p50, p95 = time_queries(lambda q: index_search(index, faqs, q, threshold=0.0), queries[:args.queries])
+        print(f"{'index':<15} {size:>8} {build:>8.2f} {p50:>9.3f} {p95:>9.3f}")
+        if NUMPY_AVAILABLE:
+            start = time.perf_counter()
+            dense = DenseFAQIndex(faqs)
+            build = time.perf_counter() - start
+            p50, p95 = time_queries(lambda q: dense.search(q, threshold=0.0), queries[:args.queries])
+            print(f"{'dense':<15} {size:>8} {build:>8.2f} {p50:>9.3f} {p95:>9.3f}")
+            p50, p95 = time_queries(lambda q: hybrid_search(index, dense, q), queries[:args.queries])
+            print(f"{'hybrid':<15} {size:>8} {0:>8.2f} {p50:>9.3f} {p95:>9.3f}")
+        questions = with_question_words(faqs)
+        start = time.perf_counter()
+        prefix = PrefixIndex(questions)
+        build = time.perf_counter() - start
+        for name, inputs in completion_inputs(questions, min(args.queries, size)).items():
+            p50, p95 = time_queries(prefix.complete, inputs)
+            print(f"{'prefix ' + name:<15} {size:>8} {build:>8.2f} {p50:>9.3f} {p95:>9.3f}")
+            build = 0
+        p50, p95 = time_queries(lambda q: legacy_search(faqs, q, threshold=0.0), queries[:args.legacy_queries])
+        print(f"{'legacy':<15} {size:>8} {0:>8.2f} {p50:>9.3f} {p95:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
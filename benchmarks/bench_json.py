@@ -0,0 +1,101 @@
+"""Encode time and size of the JSON written for /api/submissions and the store.
+
+Usage: python benchmarks/bench_json.py [--submissions 10000] [--repeat 20]
+
+Compares the old encoders (Flask's default provider and the JSON store's
+``indent=2`` save) with ``utils/json_codec.py`` on the stdlib and, when it
+is installed, on orjson. Also times a full /api/submissions?limit=1000
+request with each encoder.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import synthetic_submissions  # noqa: E402
+from utils import json_codec  # noqa: E402
+
+
+def timed(encode, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(encode())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), size
+
+
+def encoders():
+    # None is the encoder this repo used before utils/json_codec.py.
+    yield 'old', None
+    yield 'stdlib compact', False
+    if json_codec.orjson is not None:
+        yield 'orjson', True
+
+
+def encode_with(use_orjson, obj, sort_keys):
+    json_codec.USE_ORJSON = use_orjson
+    return json_codec.dumps(obj, sort_keys=sort_keys)
+
+
+def bench_payloads(document, repeat):
+    page = {
+        'success': True,
+        'data': {collection: records[:334] for collection, records in document.items()},
+        'counts': {collection: len(records) for collection, records in document.items()},
+        'next_cursor': 'internships:333'
+    }
+    cases = [
+        ('/api/submissions page (1000 records)', page, True,
+         lambda: json.dumps(page, sort_keys=True, separators=(',', ':')).encode('utf-8')),
+        ('store save (whole document)', document, False,
+         lambda: json.dumps(document, ensure_ascii=False, indent=2).encode('utf-8')),
+    ]
+    print(f"{'payload':<38} {'encoder':<16} {'ms':>8} {'bytes':>11}")
+    for label, obj, sort_keys, old in cases:
+        for name, use_orjson in encoders():
+            if use_orjson is None:
+                ms, size = timed(old, repeat)
+            else:
+                ms, size = timed(lambda: encode_with(use_orjson, obj, sort_keys), repeat)
+            print(f'{label:<38} {name:<16} {ms:>8.2f} {size:>11}')
+
+
+def bench_endpoint(document, repeat):
+    import tempfile
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, 'submissions.json'), 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        os.environ['DATA_DIR'] = workdir
+        os.environ.setdefault('NOTIFICATION_SINK', 'stub')
+        os.chdir(ROOT)
+        from app import app
+        client = app.test_client()
+        print(f"\n{'GET /api/submissions?limit=1000':<38} {'encoder':<16} {'ms':>8} {'bytes':>11}")
+        for name, use_orjson in encoders():
+            if use_orjson is None:
+                continue
+            json_codec.USE_ORJSON = use_orjson
+            ms, size = timed(lambda: client.get('/api/submissions?limit=1000').get_data(), repeat)
+            print(f"{'':<38} {name:<16} {ms:>8.2f} {size:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--submissions', type=int, default=10000, help='synthetic records per collection')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    document = synthetic_submissions(args.submissions)
+    bench_payloads(document, args.repeat)
+    bench_endpoint(document, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Per-POST latency of /api/contact as the submission store grows.
+
+Usage: python benchmarks/bench_submission_store.py [--sizes 0,10000,100000] [--posts 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import synthetic_submissions  # noqa: E402
+from models import submission_store  # noqa: E402
+from models.sqlite_store import SQLiteSubmissionStore  # noqa: E402
+from models.submission_store import JSONFileStore, LogSubmissionStore  # noqa: E402
+
+
+def build_store(backend, size, workdir):
+    document = synthetic_submissions(size, collections=('contacts',))
+    json_path = os.path.join(workdir, 'submissions.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f)
+    if backend == 'json':
+        return JSONFileStore(json_path)
+    if backend == 'sqlite':
+        return SQLiteSubmissionStore(os.path.join(workdir, 'submissions.db'), import_file=json_path,
+                                     log_dir=None)
+    return LogSubmissionStore(os.path.join(workdir, 'log'), import_file=json_path)
+
+
+def measure(client, posts):
+    payload = {'name': 'Bench', 'email': 'bench@example.com', 'subject': 'bench', 'message': 'hi'}
+    timings = []
+    for _ in range(posts):
+        start = time.perf_counter()
+        response = client.post('/api/contact', json=payload)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 201, response.data
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='0,10000,100000')
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--json-max-size', type=int, default=10000,
+                        help='skip the legacy JSON backend above this size')
+    args = parser.parse_args()
+
+    os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+    from app import app
+    client = app.test_client()
+
+    print(f"{'backend':<8} {'stored':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for backend in ('log', 'sqlite', 'json'):
+        for size in [int(s) for s in args.sizes.split(',')]:
+            if backend == 'json' and size > args.json_max_size:
+                continue
+            with tempfile.TemporaryDirectory() as workdir:
+                store = build_store(backend, size, workdir)
+                submission_store._store = store
+                p50, p95 = measure(client, args.posts)
+                store.close()
+            print(f'{backend:<8} {size:>8} {p50:>9.3f} {p95:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
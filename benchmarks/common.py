@@ -0,0 +1,142 @@
+"""Synthetic data and request transports shared by the benchmark scripts.
+
+Nothing here imports the app: the scripts point ``DATA_DIR``/``FAQ_FILE`` at
+their generated data before they import it.
+"""
+import http.client
+import json
+import random
+import threading
+import urllib.parse
+
+COLLECTIONS = ('contacts', 'services', 'internships')
+SERVICES = ['web-development', 'mobile-app', 'cloud-solutions', 'ui-ux-design', 'consulting']
+BUDGETS = ['', 'under-50k', '50k-1l', '1l-5l', 'above-5l']
+AREAS = ['web-development', 'mobile-development', 'data-science', 'cloud-computing', 'ui-ux']
+DURATIONS = ['1-month', '3-months', '6-months']
+YEARS = ['', '1st', '2nd', '3rd', '4th']
+CATEGORIES = ['services', 'internship', 'pricing', 'technology', 'contact', 'company', 'certification']
+WORDS = ('website mobile app cloud internship training price cost project design team support '
+         'certificate duration remote payment deadline hosting security react python data').split()
+
+
+def synthetic_submissions(size, seed=11, collections=COLLECTIONS):
+    """``size`` records in each of ``collections``; the other collections stay empty."""
+    rng = random.Random(seed)
+    document = {collection: [] for collection in COLLECTIONS}
+    for i in range(size):
+        day = f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00'
+        if 'contacts' in collections:
+            document['contacts'].append({
+                'id': f'contact_bench_{i}', 'type': 'contact', 'timestamp': day,
+                'data': {'name': f'User {i}', 'email': f'user{i}@example.com', 'phone': '', 'subject': 'general',
+                         'message': ' '.join(rng.choices(WORDS, k=20)), 'urgency': '', 'budget': rng.choice(BUDGETS)}
+            })
+        if 'services' in collections:
+            document['services'].append({
+                'id': f'service_bench_{i}', 'type': 'service_request', 'timestamp': day,
+                'data': {'name': f'User {i}', 'email': f'user{i}@example.com', 'company': '',
+                         'service': rng.choice(SERVICES), 'project_details': ' '.join(rng.choices(WORDS, k=20)),
+                         'budget': rng.choice(BUDGETS), 'timeline': ''}
+            })
+        if 'internships' in collections:
+            document['internships'].append({
+                'id': f'internship_bench_{i}', 'type': 'internship_application', 'timestamp': day,
+                'data': {'name': f'User {i}', 'email': f'user{i}@example.com', 'phone': '9999999999',
+                         'college': '', 'course': '', 'year': rng.choice(YEARS), 'area': rng.choice(AREAS),
+                         'skills': 'Python', 'duration': rng.choice(DURATIONS), 'start_date': '',
+                         'availability': '', 'motivation': ' '.join(rng.choices(WORDS, k=20))}
+            })
+    return document
+
+
+def synthetic_vocabulary(terms):
+    return [f'term{i}' for i in range(terms)]
+
+
+def synthetic_faqs(size, seed=13, vocabulary=None, categories=CATEGORIES):
+    """A ``faqs.json`` document with random questions, answers and keywords."""
+    rng = random.Random(seed)
+    vocabulary = vocabulary or WORDS + synthetic_vocabulary(5000)
+    return {'faqs': [{
+        'id': i + 1,
+        'question': ' '.join(rng.choices(vocabulary, k=8)) + '?',
+        'answer': ' '.join(rng.choices(vocabulary, k=40)),
+        'category': rng.choice(categories),
+        'keywords': rng.choices(vocabulary, k=4)
+    } for i in range(size)]}
+
+
+class TestClientTransport:
+    """Calls the app in-process, with one Flask test client per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def _client(self):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        return self.local.client
+
+    def request(self, method, path, body):
+        response = self._client().open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def post(self, path, payload):
+        response = self._client().post(path, json=payload)
+        return response.status_code, response.get_json()
+
+    def get(self, path):
+        response = self._client().get(path)
+        return response.status_code, response.get_json()
+
+    def get_lines(self, path):
+        response = self._client().get(path)
+        return response.status_code, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+class HTTPTransport:
+    """Calls a running server over one keep-alive connection per thread."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = urllib.parse.urlparse(base_url)
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def _send(self, method, path, body=None):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(
+                self.base_url.hostname, self.base_url.port or 80, timeout=self.timeout)
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            raise
+
+    def _json(self, method, path, body=None):
+        status, data = self._send(method, path, body)
+        return status, json.loads(data) if status < 400 else None
+
+    def request(self, method, path, body):
+        try:
+            return self._send(method, path, body)[0]
+        except (OSError, http.client.HTTPException):
+            return 'error'
+
+    def post(self, path, payload):
+        return self._json('POST', path, payload)
+
+    def get(self, path):
+        return self._json('GET', path)
+
+    def get_lines(self, path):
+        status, data = self._send('GET', path)
+        return status, [json.loads(line) for line in data.splitlines()]
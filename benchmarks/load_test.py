@@ -0,0 +1,132 @@
+"""HTTP load test: requests per second and latency against a running server.
+
+Usage:
+  python benchmarks/load_test.py --url http://localhost:5000 [--concurrency 16] [--duration 10]
+  python benchmarks/load_test.py --compare    # start the dev server and gunicorn in turn
+
+Each client thread keeps one HTTP/1.1 connection open and cycles through the
+GET paths, with one contact POST every --post-every requests. Start the
+server under test with RATE_LIMIT_ENABLED=0, or the POSTs are rate limited.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GET_PATHS = ['/api/health', '/api/stats', '/api/services/stats', '/api/faq/health', '/api/submissions?limit=20']
+
+
+def client(base, paths, post_every, deadline, latencies, errors):
+    parsed = urllib.parse.urlparse(base)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    body = json.dumps({'name': 'Load', 'email': 'load@example.com', 'subject': 'load', 'message': 'test'})
+    count = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if post_every and count % post_every == post_every - 1:
+                conn.request('POST', '/api/contact', body, {'Content-Type': 'application/json'})
+            else:
+                conn.request('GET', paths[count % len(paths)])
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+        count += 1
+    conn.close()
+
+
+def run(base, concurrency, duration, post_every):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(base, GET_PATHS, post_every, deadline, latencies, errors))
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / duration,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else None,
+        'errors': len(errors)
+    }
+
+
+def wait_until_up(base, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base + '/api/health', timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server at {base} did not start')
+
+
+def compare(args):
+    servers = {
+        'dev server': [sys.executable, 'app.py'],
+        'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+    }
+    results = {}
+    for name, command in servers.items():
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, PORT=str(args.port), DATA_DIR=data_dir, FLASK_ENV='production',
+                       RATE_LIMIT_ENABLED='0')
+            process = subprocess.Popen(command, cwd=ROOT, env=env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                base = f'http://127.0.0.1:{args.port}'
+                wait_until_up(base)
+                results[name] = run(base, args.concurrency, args.duration, args.post_every)
+            finally:
+                process.terminate()
+                process.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--post-every', type=int, default=20, help='0 disables POSTs')
+    args = parser.parse_args()
+
+    if args.compare:
+        results = compare(args)
+    elif args.url:
+        results = {args.url: run(args.url.rstrip('/'), args.concurrency, args.duration, args.post_every)}
+    else:
+        parser.error('pass --url or --compare')
+
+    print(f"{'server':<28} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['requests']:>9} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} "
+              f"{result['p95_ms']:>8.2f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
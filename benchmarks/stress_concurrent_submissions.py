@@ -0,0 +1,106 @@
+"""Fire thousands of concurrent POSTs and check that no submission is lost.
+
+Runs in-process against the Flask test client by default, with readers polling
+/api/submissions at the same time. Pass --url to hit a running server instead
+(started with RATE_LIMIT_ENABLED=0).
+
+Usage: python benchmarks/stress_concurrent_submissions.py [--backend log|json|sqlite] [--threads 32] [--posts 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import HTTPTransport, TestClientTransport  # noqa: E402
+from models import submission_store  # noqa: E402
+from models.sqlite_store import SQLiteSubmissionStore  # noqa: E402
+from models.submission_store import JSONFileStore, LogSubmissionStore  # noqa: E402
+
+
+def run(transport, threads, posts, readers):
+    errors = []
+    stop = threading.Event()
+    run_id = f'stress-{int(time.time() * 1000)}'
+
+    def writer(worker):
+        for i in range(posts):
+            status, body = transport.post('/api/contact', {
+                'name': f'Stress {worker}',
+                'email': f'stress{worker}@example.com',
+                'subject': run_id,
+                'message': f'{worker}:{i}'
+            })
+            if status != 201:
+                errors.append(f'POST {worker}:{i} -> {status} {body}')
+
+    def reader():
+        while not stop.is_set():
+            status, body = transport.get('/api/submissions')
+            if status != 200 or not body or not body.get('success'):
+                errors.append(f'GET /api/submissions -> {status} {body}')
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+    status, contacts = transport.get_lines('/api/submissions?type=contacts&format=ndjson')
+    stored = [c['data']['message'] for c in contacts if c['data']['subject'] == run_id]
+    expected = {f'{w}:{i}' for w in range(threads) for i in range(posts)}
+    missing = expected - set(stored)
+    duplicated = len(stored) - len(set(stored))
+
+    total = threads * posts
+    print(f'{total} POSTs from {threads} threads in {elapsed:.2f}s ({total / elapsed:.0f} req/s)')
+    print(f'stored={len(stored)} missing={len(missing)} duplicated={duplicated} errors={len(errors)}')
+    for error in errors[:10]:
+        print('  ' + error)
+    return not missing and not duplicated and not errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=('log', 'json', 'sqlite'), default='log')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--url', help='base URL of a running server, e.g. http://localhost:5000')
+    args = parser.parse_args()
+
+    if args.url:
+        ok = run(HTTPTransport(args.url), args.threads, args.posts, args.readers)
+        sys.exit(0 if ok else 1)
+
+    os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+    from app import app
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.backend == 'json':
+            store = JSONFileStore(os.path.join(workdir, 'submissions.json'))
+        elif args.backend == 'sqlite':
+            store = SQLiteSubmissionStore(os.path.join(workdir, 'submissions.db'), import_file=None, log_dir=None)
+        else:
+            store = LogSubmissionStore(os.path.join(workdir, 'log'), import_file=None)
+        submission_store._store = store
+        ok = run(TestClientTransport(app), args.threads, args.posts, args.readers)
+        store.close()
+
+        if args.backend == 'log':
+            replayed = LogSubmissionStore(os.path.join(workdir, 'log'), import_file=None)
+            print(f"replayed from disk: {len(replayed.load()['contacts'])} contacts")
+            replayed.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Fire POSTs from several worker processes sharing one store and check the totals.
+
+Mirrors gunicorn with ``preload_app``: the app and store are loaded once,
+then ``--workers`` processes are forked. Each worker posts ``--posts``
+contacts from ``--threads`` threads through its own test client. Once every
+worker is done, each one reports what its own view of the store holds
+(``/api/stats`` and the ``/api/submissions`` export), and so does the parent.
+All views must hold every submission exactly once. For the log backend the
+directory is also replayed from scratch. A small ``--segment-bytes`` makes
+the workers rotate and compact segments under each other.
+
+Usage: python benchmarks/stress_multiprocess_submissions.py [--backend log|json|sqlite] [--workers 4] [--posts 200]
+
+To test a real multi-worker server instead, start gunicorn with
+``WEB_CONCURRENCY=4 RATE_LIMIT_ENABLED=0`` and point
+``stress_concurrent_submissions.py --url`` at it.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def view(client, run_id):
+    stats = client.get('/api/stats').get_json()['stats']
+    lines = client.get('/api/submissions?type=contacts&format=ndjson').get_data(as_text=True).splitlines()
+    messages = [record['data']['message'] for record in map(json.loads, lines)
+                if record['data']['subject'] == run_id]
+    return {'pid': os.getpid(), 'total_contacts': stats['total_contacts'], 'messages': messages}
+
+
+def worker(number, app, run_id, threads, posts, barrier, results):
+    errors = []
+
+    def post(thread):
+        client = app.test_client()
+        for i in range(posts // threads):
+            response = client.post('/api/contact', json={
+                'name': f'Worker {number}',
+                'email': f'worker{number}@example.com',
+                'subject': run_id,
+                'message': f'{number}:{thread}:{i}'
+            })
+            if response.status_code != 201:
+                errors.append(f'{number}:{thread}:{i} -> {response.status_code} {response.get_data(as_text=True)}')
+
+    posters = [threading.Thread(target=post, args=(t,)) for t in range(threads)]
+    for thread in posters:
+        thread.start()
+    for thread in posters:
+        thread.join()
+    barrier.wait()
+    result = view(app.test_client(), run_id)
+    result['errors'] = errors
+    results.put(result)
+
+
+def check(label, result, expected):
+    messages = result['messages']
+    missing = len(expected - set(messages))
+    duplicated = len(messages) - len(set(messages))
+    ok = not missing and not duplicated and result['total_contacts'] == len(expected) and not result.get('errors')
+    print(f"{label:<18} stats={result['total_contacts']:<6} stored={len(messages):<6} missing={missing} "
+          f"duplicated={duplicated} errors={len(result.get('errors', []))} {'ok' if ok else 'FAILED'}")
+    for error in result.get('errors', [])[:5]:
+        print('  ' + error)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=('log', 'json', 'sqlite'), default='log')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='posting threads per worker')
+    parser.add_argument('--posts', type=int, default=200, help='POSTs per worker')
+    parser.add_argument('--segment-bytes', type=int, default=64 * 1024, help='log segment size')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.update({
+            'DATA_DIR': workdir,
+            'SUBMISSION_STORE': args.backend,
+            'SUBMISSION_SEGMENT_MAX_BYTES': str(args.segment_bytes),
+            'SUBMISSION_COMPACT_AFTER_SEGMENTS': '2',
+            'RATE_LIMIT_ENABLED': '0',
+            'NOTIFICATION_SINK': 'stub',
+        })
+        os.chdir(ROOT)
+        from app import app
+        from models.submission_store import LogSubmissionStore, get_store
+        get_store().aggregates()
+
+        run_id = f'multiprocess-{int(time.time() * 1000)}'
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(args.workers)
+        results = context.Queue()
+        start = time.perf_counter()
+        processes = [context.Process(target=worker, args=(n, app, run_id, args.threads, args.posts, barrier, results))
+                     for n in range(args.workers)]
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        per_worker = args.posts // args.threads * args.threads
+        expected = {f'{n}:{t}:{i}' for n in range(args.workers) for t in range(args.threads)
+                    for i in range(per_worker // args.threads)}
+        total = len(expected)
+        print(f'{total} POSTs from {args.workers} processes x {args.threads} threads in {elapsed:.2f}s '
+              f'({total / elapsed:.0f} req/s), backend={args.backend}')
+        ok = True
+        for report in sorted(reports, key=lambda r: r['pid']):
+            ok &= check(f"worker {report['pid']}", report, expected)
+        ok &= check('parent', view(app.test_client(), run_id), expected)
+
+        if args.backend == 'log':
+            get_store().close()
+            replayed = LogSubmissionStore(os.path.join(workdir, 'submissions_log'), import_file=None)
+            messages = [r['data']['message'] for r in replayed.load()['contacts'] if r['data']['subject'] == run_id]
+            ok &= check('replayed from disk', {'total_contacts': replayed.aggregates().total('contacts'),
+                                               'messages': messages}, expected)
+            segments = sorted(os.listdir(replayed.log_dir))
+            print(f'log files: {", ".join(segments)}')
+            replayed.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
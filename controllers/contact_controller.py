@@ -1,26 +1,18 @@
 from flask import Blueprint, request, jsonify
-import json
-import os
 from datetime import datetime
 
-contact_bp = Blueprint('contact', __name__)
-DATA_FILE = 'data/submissions.json'
-
-def load_data():
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {'contacts': [], 'services': [], 'internships': []}
+from models.submission_store import get_store
+from utils.jobs import get_job_queue
+from utils.listing import collection_listing
+from utils.profiling import phase
 
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+contact_bp = Blueprint('contact', __name__)
 
 @contact_bp.route('/contact', methods=['POST'])
 def submit_contact():
     try:
-        form_data = request.get_json()
+        with phase('parse'):
+            form_data = request.get_json()
         required_fields = ['name', 'email', 'subject', 'message']
         for field in required_fields:
             if not form_data.get(field):
@@ -29,7 +21,7 @@ def submit_contact():
                     'error': f'Missing required field: {field}'
                 }), 400
         contact_submission = {
-            'id': f'contact_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            'id': get_store().new_id('contact'),
             'type': 'contact',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -42,12 +34,9 @@ def submit_contact():
                 'budget': form_data.get('budget', '')
             }
         }
-        data = load_data()
-        data['contacts'].append(contact_submission)
-        save_data(data)
-        print(f"📧 New contact submission from: {form_data['name']} ({form_data['email']})")
-        print(f"   Subject: {form_data['subject']}")
-        print(f"   Urgency: {form_data.get('urgency', 'Not specified')}")
+        with phase('store'):
+            get_store().append('contacts', contact_submission)
+        get_job_queue().enqueue('submission_created', {'collection': 'contacts', 'submission': contact_submission})
         
         return jsonify({
             'success': True,
@@ -67,13 +56,12 @@ def submit_contact():
 @contact_bp.route('/contact/<submission_id>', methods=['GET'])
 def get_contact_submission(submission_id):
     try:
-        data = load_data()
-        for contact in data['contacts']:
-            if contact['id'] == submission_id:
-                return jsonify({
-                    'success': True,
-                    'data': contact
-                })
+        contact = get_store().get('contacts', submission_id)
+        if contact is not None:
+            return jsonify({
+                'success': True,
+                'data': contact
+            })
         
         return jsonify({
             'success': False,
@@ -89,12 +77,7 @@ def get_contact_submission(submission_id):
 @contact_bp.route('/contact', methods=['GET'])
 def get_all_contacts():
     try:
-        data = load_data()
-        return jsonify({
-            'success': True,
-            'data': data['contacts'],
-            'count': len(data['contacts'])
-        })
+        return collection_listing(get_store(), 'contacts', request.args)
         
     except Exception as e:
         return jsonify({
@@ -1,58 +1,256 @@
-import json
 import os
-import re
+import threading
+import time
 from flask import Blueprint, request, jsonify
 
+from models.faq_index import (NUMPY_AVAILABLE, DenseFAQIndex, FAQIndex, PrefixIndex, faq_digest, hybrid_search,
+                              load_snapshot, tokenize)
+from models.submission_store import DATA_DIR, atomic_write
+from utils import json_codec
+from utils.admin import is_admin_request
+from utils.metrics import FAQ_SEARCH_SECONDS
+from utils.profiling import phase
+from utils.response_cache import cached_response
+from utils.ttl_cache import TTLCache
+
 faq_bp = Blueprint('faq', __name__)
-FAQ_FILE = 'data/faqs.json'
+FAQ_FILE = os.environ.get('FAQ_FILE', 'data/faqs.json')
+FAQ_SNAPSHOT_DIR = os.environ.get('FAQ_SNAPSHOT_DIR', 'data/faq_index')
+SEARCH_MODES = ('keyword', 'dense', 'hybrid')
+DEFAULT_SEARCH_MODE = os.environ.get('FAQ_SEARCH_MODE', 'keyword')
+HYBRID_ALPHA = float(os.environ.get('FAQ_HYBRID_ALPHA', 0.5))
+SEARCH_CACHE_SIZE = int(os.environ.get('FAQ_SEARCH_CACHE_SIZE', 1024))
+SEARCH_CACHE_TTL = float(os.environ.get('FAQ_SEARCH_CACHE_TTL', 300))
+WATCH_INTERVAL = float(os.environ.get('FAQ_WATCH_INTERVAL', 0))
+# Rewritten by /api/faq/reload so every worker process notices the reload, not just the one that handled it.
+RELOAD_STAMP_FILE = os.environ.get('FAQ_RELOAD_STAMP_FILE', os.path.join(DATA_DIR, 'faq-reload'))
+# How often, at most, a request checks faqs.json and the reload stamp for changes.
+RELOAD_CHECK_INTERVAL = float(os.environ.get('FAQ_RELOAD_CHECK_INTERVAL', 1))
+AUTOCOMPLETE_LIMIT = int(os.environ.get('FAQ_AUTOCOMPLETE_LIMIT', 5))
+BATCH_MAX_QUERIES = int(os.environ.get('FAQ_BATCH_MAX_QUERIES', 10))
+
+class FAQSnapshot:
+    """Immutable FAQ list plus the indexes built from it.
+
+    The dense index is only built, or memory-mapped from ``dense_prefix``,
+    when the first dense or hybrid search needs it. Without a prebuilt
+    ``prefix_index``, the autocomplete index is built by the first completion.
+    """
+
+    def __init__(self, faqs, generation, file_stamp=None, index=None, dense_prefix=None, prefix_index=None):
+        self.faqs = faqs
+        self.generation = generation
+        self.file_stamp = file_stamp
+        self.index = index if index is not None else FAQIndex(faqs)
+        self._dense_prefix = dense_prefix
+        self._dense_index = None
+        self._build_lock = threading.Lock()
+        self._prefix_index = prefix_index
+
+    @property
+    def dense_index(self):
+        if self._dense_index is None and NUMPY_AVAILABLE:
+            with self._build_lock:
+                if self._dense_index is None:
+                    if self._dense_prefix is not None:
+                        self._dense_index = DenseFAQIndex.load(self._dense_prefix)
+                    else:
+                        self._dense_index = DenseFAQIndex(self.faqs)
+        return self._dense_index
+
+    @property
+    def prefix_index(self):
+        if self._prefix_index is None:
+            with self._build_lock:
+                if self._prefix_index is None:
+                    self._prefix_index = PrefixIndex(self.faqs)
+        return self._prefix_index
+
+
+def _stat_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def faq_file_stamp():
+    """Changes when ``faqs.json`` changes or any process asks for a reload."""
+    return _stat_stamp(FAQ_FILE), _stat_stamp(RELOAD_STAMP_FILE)
+
+
+def request_reload_everywhere():
+    os.makedirs(os.path.dirname(RELOAD_STAMP_FILE) or '.', exist_ok=True)
+    atomic_write(RELOAD_STAMP_FILE, f'{time.time_ns()} {os.getpid()}\n'.encode('ascii'))
+
 
 class FAQRAGModel:
+    """FAQ search over an atomically swapped ``FAQSnapshot``.
+
+    Reloads build a complete new snapshot off to the side and then replace
+    the reference in one assignment, so a search running during a reload
+    keeps using the snapshot it started with. Every worker process has its
+    own model, so each one compares ``faq_file_stamp()`` with the last
+    stamp it saw, at most once every ``FAQ_RELOAD_CHECK_INTERVAL`` seconds,
+    and reloads when it changed.
+    """
+
     def __init__(self):
-        self.faqs = []
+        self.search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+        self.snapshot = FAQSnapshot([], 0)
+        self.last_reload_error = None
+        self.loaded_from = None
+        self.load_seconds = None
+        self._reload_lock = threading.Lock()
+        self._reload_state_lock = threading.Lock()
+        self._reload_thread = None
+        self._reload_again = False
+        self._watcher_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._check_lock = threading.Lock()
+        self._next_check = 0.0
+        self._seen_stamp = None
         self.load_faqs()
     
+    @property
+    def faqs(self):
+        return self.snapshot.faqs
+    
+    @property
+    def index(self):
+        return self.snapshot.index
+    
+    @property
+    def dense_index(self):
+        return self.snapshot.dense_index
+    
     def load_faqs(self):
-        try:
-            with open(FAQ_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.faqs = data.get('faqs', [])
-        except FileNotFoundError:
-            self.faqs = []
-    
-    def preprocess_text(self, text):
-        text = re.sub(r'[^a-zA-Z0-9\s]', '', text.lower())
-        return text.strip()
-    
-    def simple_similarity(self, query, text):
-        """Simple keyword-based similarity scoring"""
-        query_words = set(self.preprocess_text(query).split())
-        text_words = set(self.preprocess_text(text).split())
+        with self._reload_lock:
+            start = time.perf_counter()
+            stamp = faq_file_stamp()
+            self._seen_stamp = stamp
+            try:
+                with open(FAQ_FILE, 'rb') as f:
+                    payload = f.read()
+            except FileNotFoundError:
+                payload = b'{}'
+            prebuilt = load_snapshot(FAQ_SNAPSHOT_DIR, faq_digest(payload))
+            if prebuilt is not None:
+                faqs, index, prefix_index, dense_prefix = prebuilt
+                snapshot = FAQSnapshot(faqs, self.snapshot.generation + 1, stamp, index, dense_prefix, prefix_index)
+                self.loaded_from = 'snapshot'
+            else:
+                faqs = json_codec.loads(payload).get('faqs', [])
+                snapshot = FAQSnapshot(faqs, self.snapshot.generation + 1, stamp)
+                self.loaded_from = 'json'
+            self.snapshot = snapshot
+            # Cached FAQ responses are keyed on the generation, so only the search cache needs clearing.
+            self.search_cache.clear()
+            self.last_reload_error = None
+            self.load_seconds = time.perf_counter() - start
+    
+    def reload_in_background(self):
+        """Start a reload, or have the running one load the file once more when it finishes.
+
+        Only one reload thread runs at a time, so two loads never race to
+        publish their snapshots, and a change made during a reload is not lost.
+        """
+        def reload():
+            while True:
+                try:
+                    self.load_faqs()
+                    print(f"FAQs reloaded: {len(self.faqs)} entries")
+                except Exception as e:
+                    self.last_reload_error = str(e)
+                    print(f"❌ FAQ reload failed, keeping previous FAQs: {str(e)}")
+                with self._reload_state_lock:
+                    if not self._reload_again:
+                        self._reload_thread = None
+                        return
+                    self._reload_again = False
         
-        if not query_words or not text_words:
-            return 0
+        with self._reload_state_lock:
+            # is_alive() is False in a forked child, where the parent's thread does not exist.
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                self._reload_again = True
+                return self._reload_thread
+            thread = self._reload_thread = threading.Thread(target=reload, name='faq-reload', daemon=True)
+            thread.start()
+        return thread
+    
+    def check_for_changes(self):
+        """Reload in the background if ``faqs.json`` or the reload stamp changed."""
+        now = time.monotonic()
+        if now < self._next_check or not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            stamp = faq_file_stamp()
+            if stamp != self._seen_stamp:
+                # Marked as seen first, so a broken file is not retried on every request.
+                self._seen_stamp = stamp
+                self.reload_in_background()
+        finally:
+            self._check_lock.release()
+    
+    def ensure_watcher(self):
+        """Poll ``FAQ_FILE`` every ``FAQ_WATCH_INTERVAL`` seconds and reload it when it changes."""
+        if WATCH_INTERVAL <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
         
-        intersection = query_words.intersection(text_words)
-        union = query_words.union(text_words)
+        def watch():
+            seen = self.snapshot.file_stamp
+            while True:
+                time.sleep(WATCH_INTERVAL)
+                stamp = faq_file_stamp()
+                if stamp != seen:
+                    seen = stamp
+                    self.reload_in_background().join()
         
-        return len(intersection) / len(union) if union else 0
+        self._watcher = threading.Thread(target=watch, name='faq-watcher', daemon=True)
+        self._watcher.start()
+    
+    def available_modes(self):
+        return SEARCH_MODES if NUMPY_AVAILABLE else ('keyword',)
     
-    def search_faqs(self, query, top_k=3, threshold=0.1):
-        if not self.faqs:
-            return []
+    def search_faqs(self, query, top_k=3, threshold=0.1, mode=None):
+        snapshot = self.snapshot
+        mode = mode or DEFAULT_SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f'Unknown search mode: {mode}')
+        start = time.perf_counter()
+        cache_key = (snapshot.generation, ' '.join(tokenize(query)), top_k, threshold, mode)
+        results = self.search_cache.get(cache_key)
+        if results is not None:
+            FAQ_SEARCH_SECONDS.observe(time.perf_counter() - start, mode, 'hit')
+            return results
         
-        results = []
-        for faq in self.faqs:
-            combined_text = f"{faq['question']} {faq['answer']} {' '.join(faq.get('keywords', []))}"
-            similarity = self.simple_similarity(query, combined_text)
-            
-            if similarity > threshold:
-                faq_copy = faq.copy()
-                faq_copy['similarity_score'] = similarity
-                results.append(faq_copy)
+        if mode == 'dense' and snapshot.dense_index is not None:
+            matches = snapshot.dense_index.search(query, top_k=top_k, threshold=threshold)
+        elif mode == 'hybrid' and snapshot.dense_index is not None:
+            matches = hybrid_search(snapshot.index, snapshot.dense_index, query, top_k=top_k,
+                                    threshold=threshold, alpha=HYBRID_ALPHA)
+        else:
+            matches = snapshot.index.search(query, top_k=top_k, threshold=threshold)
         
-        # Sort by similarity score and return top_k
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return results[:top_k]
+        results = []
+        for doc_id, similarity in matches:
+            faq_copy = snapshot.faqs[doc_id].copy()
+            faq_copy['similarity_score'] = similarity
+            results.append(faq_copy)
+        self.search_cache.set(cache_key, results)
+        FAQ_SEARCH_SECONDS.observe(time.perf_counter() - start, mode, 'miss')
+        return results
+    
+    def autocomplete(self, text, limit=AUTOCOMPLETE_LIMIT):
+        snapshot = self.snapshot
+        return [snapshot.faqs[doc_id] for doc_id in snapshot.prefix_index.complete(text, limit)]
     
     def get_all_faqs(self):
         return self.faqs
@@ -60,12 +258,26 @@ class FAQRAGModel:
     def get_faq_by_category(self, category):
         return [faq for faq in self.faqs if faq.get('category') == category]
 
-rag_model = FAQRAGModel()
+_rag_model = None
+_rag_model_lock = threading.Lock()
+
 
-@faq_bp.route('/api/faq/search', methods=['POST'])
+def get_rag_model():
+    """The FAQ model, loaded on first use so importing the app stays cheap."""
+    global _rag_model
+    if _rag_model is None:
+        with _rag_model_lock:
+            if _rag_model is None:
+                _rag_model = FAQRAGModel()
+    _rag_model.ensure_watcher()
+    _rag_model.check_for_changes()
+    return _rag_model
+
+@faq_bp.route('/faq/search', methods=['POST'])
 def search_faq():
     try:
-        data = request.get_json()
+        with phase('parse'):
+            data = request.get_json()
         query = data.get('query', '').strip()
         
         if not query:
@@ -73,7 +285,15 @@ def search_faq():
                 'success': False,
                 'error': 'Query is required'
             }), 400
-        results = rag_model.search_faqs(query, top_k=3)
+        mode = data.get('mode')
+        rag_model = get_rag_model()
+        if mode is not None and mode not in rag_model.available_modes():
+            return jsonify({
+                'success': False,
+                'error': f'Search mode not available: {mode}'
+            }), 400
+        with phase('search'):
+            results = rag_model.search_faqs(query, top_k=3, mode=mode)
         
         return jsonify({
             'success': True,
@@ -88,10 +308,80 @@ def search_faq():
             'error': str(e)
         }), 500
 
+@faq_bp.route('/faq/search/batch', methods=['POST'])
+def search_faq_batch():
+    try:
+        with phase('parse'):
+            data = request.get_json()
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not queries or not all(isinstance(query, str) for query in queries):
+            return jsonify({
+                'success': False,
+                'error': 'queries must be a non-empty list of strings'
+            }), 400
+        if len(queries) > BATCH_MAX_QUERIES:
+            return jsonify({
+                'success': False,
+                'error': f'At most {BATCH_MAX_QUERIES} queries per batch'
+            }), 400
+        mode = data.get('mode')
+        rag_model = get_rag_model()
+        if mode is not None and mode not in rag_model.available_modes():
+            return jsonify({
+                'success': False,
+                'error': f'Search mode not available: {mode}'
+            }), 400
+        with phase('search'):
+            # Each query goes through the search cache on its own, so
+            # preloading the suggested questions warms it for later searches.
+            results = [rag_model.search_faqs(query.strip(), top_k=3, mode=mode) if query.strip() else []
+                       for query in queries]
+        
+        return jsonify({
+            'success': True,
+            'results': [{
+                'query': query,
+                'results': query_results,
+                'total_results': len(query_results)
+            } for query, query_results in zip(queries, results)]
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@faq_bp.route('/faq/autocomplete', methods=['GET'])
+def autocomplete_faq():
+    query = request.args.get('q', '')
+    try:
+        limit = min(int(request.args.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_LIMIT * 4)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be an integer'
+        }), 400
+    suggestions = get_rag_model().autocomplete(query, limit)
+    return jsonify({
+        'success': True,
+        'query': query,
+        'suggestions': [{
+            'id': faq.get('id'),
+            'question': faq['question'],
+            'category': faq.get('category')
+        } for faq in suggestions],
+        'total': len(suggestions)
+    })
+
+def faq_version():
+    return get_rag_model().snapshot.generation
+
 @faq_bp.route('/faq/all', methods=['GET'])
+@cached_response(faq_version)
 def get_all_faqs():
     try:
-        faqs = rag_model.get_all_faqs()
+        faqs = get_rag_model().get_all_faqs()
         return jsonify({
             'success': True,
             'faqs': faqs,
@@ -105,9 +395,10 @@ def get_all_faqs():
         }), 500
 
 @faq_bp.route('/faq/category/<category>', methods=['GET'])
+@cached_response(faq_version)
 def get_faqs_by_category(category):
     try:
-        faqs = rag_model.get_faq_by_category(category)
+        faqs = get_rag_model().get_faq_by_category(category)
         return jsonify({
             'success': True,
             'category': category,
@@ -123,9 +414,32 @@ def get_faqs_by_category(category):
 
 @faq_bp.route('/faq/health', methods=['GET'])
 def faq_health():
+        rag_model = get_rag_model()
         return jsonify({
             'success': True,
             'status': 'healthy',
             'total_faqs': len(rag_model.get_all_faqs()),
-            'model_ready': True
+            'model_ready': True,
+            'search_modes': list(rag_model.available_modes()),
+            'search_cache': rag_model.search_cache.stats(),
+            'generation': rag_model.snapshot.generation,
+            'last_reload_error': rag_model.last_reload_error,
+            'loaded_from': rag_model.loaded_from,
+            'load_ms': round(rag_model.load_seconds * 1000, 2)
         })
+
+@faq_bp.route('/faq/reload', methods=['POST'])
+def reload_faqs():
+    if not is_admin_request():
+        return jsonify({
+            'success': False,
+            'error': 'Admin token required'
+        }), 403
+    rag_model = get_rag_model()
+    request_reload_everywhere()
+    rag_model.reload_in_background()
+    return jsonify({
+        'success': True,
+        'message': 'FAQ reload started; other workers reload on their next request',
+        'generation': rag_model.snapshot.generation
+    }), 202
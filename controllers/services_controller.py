@@ -1,26 +1,19 @@
 from flask import Blueprint, request, jsonify
-import json
-import os
 from datetime import datetime
 
-services_bp = Blueprint('services', __name__)
-DATA_FILE = 'data/submissions.json'
-
-def load_data():
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {'contacts': [], 'services': [], 'internships': []}
+from models.submission_store import get_store
+from utils.jobs import get_job_queue
+from utils.listing import collection_listing
+from utils.profiling import phase
+from utils.response_cache import cached_response, submissions_version
 
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+services_bp = Blueprint('services', __name__)
 
 @services_bp.route('/services', methods=['POST'])
 def submit_service_request():
     try:
-        form_data = request.get_json()
+        with phase('parse'):
+            form_data = request.get_json()
         required_fields = ['name', 'email', 'service', 'project-details']
         for field in required_fields:
             if not form_data.get(field):
@@ -29,7 +22,7 @@ def submit_service_request():
                     'error': f'Missing required field: {field}'
                 }), 400
         service_submission = {
-            'id': f'service_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            'id': get_store().new_id('service'),
             'type': 'service_request',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -42,13 +35,9 @@ def submit_service_request():
                 'timeline': form_data.get('timeline', '')
             }
         }
-        data = load_data()
-        data['services'].append(service_submission)
-        save_data(data)
-        print(f"🔧 New service request from: {form_data['name']} ({form_data['email']})")
-        print(f"   Service: {form_data['service']}")
-        print(f"   Company: {form_data.get('company', 'Not specified')}")
-        print(f"   Budget: {form_data.get('budget', 'Not specified')}")
+        with phase('store'):
+            get_store().append('services', service_submission)
+        get_job_queue().enqueue('submission_created', {'collection': 'services', 'submission': service_submission})
         
         return jsonify({
             'success': True,
@@ -68,13 +57,12 @@ def submit_service_request():
 @services_bp.route('/services/<submission_id>', methods=['GET'])
 def get_service_submission(submission_id):
     try:
-        data = load_data()
-        for service in data['services']:
-            if service['id'] == submission_id:
-                return jsonify({
-                    'success': True,
-                    'data': service
-                })
+        service = get_store().get('services', submission_id)
+        if service is not None:
+            return jsonify({
+                'success': True,
+                'data': service
+            })
         
         return jsonify({
             'success': False,
@@ -90,12 +78,7 @@ def get_service_submission(submission_id):
 @services_bp.route('/services', methods=['GET'])
 def get_all_services():
     try:
-        data = load_data()
-        return jsonify({
-            'success': True,
-            'data': data['services'],
-            'count': len(data['services'])
-        })
+        return collection_listing(get_store(), 'services', request.args)
         
     except Exception as e:
         return jsonify({
@@ -104,26 +87,19 @@ def get_all_services():
         }), 500
 
 @services_bp.route('/services/stats', methods=['GET'])
+@cached_response(submissions_version)
 def get_service_stats():
     try:
-        data = load_data()
-        services = data['services']
-        service_counts = {}
-        budget_counts = {}
-        for service in services:
-            service_type = service['data']['service']
-            budget = service['data']['budget']
-            service_counts[service_type] = service_counts.get(service_type, 0) + 1
-            if budget:
-                budget_counts[budget] = budget_counts.get(budget, 0) + 1
+        with phase('store'):
+            aggregates = get_store().aggregates()
         
         return jsonify({
             'success': True,
             'stats': {
-                'total_requests': len(services),
-                'service_distribution': service_counts,
-                'budget_distribution': budget_counts,
-                'recent_requests': len([s for s in services if s['timestamp'].startswith(datetime.now().strftime("%Y-%m-%d"))])
+                'total_requests': aggregates.total('services'),
+                'service_distribution': aggregates.distribution('services', 'service'),
+                'budget_distribution': aggregates.distribution('services', 'budget'),
+                'recent_requests': aggregates.recent('services')
             }
         })
         
@@ -1,26 +1,19 @@
 from flask import Blueprint, request, jsonify
-import json
-import os
 from datetime import datetime
 
-training_bp = Blueprint('training', __name__)
-DATA_FILE = 'data/submissions.json'
-
-def load_data():
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {'contacts': [], 'services': [], 'internships': []}
+from models.submission_store import get_store
+from utils.jobs import get_job_queue
+from utils.listing import collection_listing
+from utils.profiling import phase
+from utils.response_cache import cached_response, submissions_version
 
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+training_bp = Blueprint('training', __name__)
 
 @training_bp.route('/training', methods=['POST'])
 def submit_internship_application():
     try:
-        form_data = request.get_json()
+        with phase('parse'):
+            form_data = request.get_json()
         required_fields = ['name', 'email', 'phone', 'area', 'skills', 'duration', 'motivation']
         for field in required_fields:
             if not form_data.get(field):
@@ -29,7 +22,7 @@ def submit_internship_application():
                     'error': f'Missing required field: {field}'
                 }), 400
         internship_submission = {
-            'id': f'internship_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            'id': get_store().new_id('internship'),
             'type': 'internship_application',
             'timestamp': datetime.now().isoformat(),
             'data': {
@@ -47,13 +40,9 @@ def submit_internship_application():
                 'motivation': form_data['motivation']
             }
         }
-        data = load_data()
-        data['internships'].append(internship_submission)
-        save_data(data)
-        print(f"🎓 New internship application from: {form_data['name']} ({form_data['email']})")
-        print(f"   Area: {form_data['area']}")
-        print(f"   Duration: {form_data['duration']}")
-        print(f"   College: {form_data.get('college', 'Not specified')}")
+        with phase('store'):
+            get_store().append('internships', internship_submission)
+        get_job_queue().enqueue('submission_created', {'collection': 'internships', 'submission': internship_submission})
         
         return jsonify({
             'success': True,
@@ -73,13 +62,12 @@ def submit_internship_application():
 @training_bp.route('/training/<submission_id>', methods=['GET'])
 def get_internship_submission(submission_id):
     try:
-        data = load_data()
-        for internship in data['internships']:
-            if internship['id'] == submission_id:
-                return jsonify({
-                    'success': True,
-                    'data': internship
-                })
+        internship = get_store().get('internships', submission_id)
+        if internship is not None:
+            return jsonify({
+                'success': True,
+                'data': internship
+            })
         
         return jsonify({
             'success': False,
@@ -95,12 +83,7 @@ def get_internship_submission(submission_id):
 @training_bp.route('/training', methods=['GET'])
 def get_all_internships():
     try:
-        data = load_data()
-        return jsonify({
-            'success': True,
-            'data': data['internships'],
-            'count': len(data['internships'])
-        })
+        return collection_listing(get_store(), 'internships', request.args)
         
     except Exception as e:
         return jsonify({
@@ -109,30 +92,20 @@ def get_all_internships():
         }), 500
 
 @training_bp.route('/training/stats', methods=['GET'])
+@cached_response(submissions_version)
 def get_internship_stats():
     try:
-        data = load_data()
-        internships = data['internships']
-        area_counts = {}
-        duration_counts = {}
-        year_counts = {}
-        for internship in internships:
-            area = internship['data']['area']
-            duration = internship['data']['duration']
-            year = internship['data']['year']
-            area_counts[area] = area_counts.get(area, 0) + 1
-            duration_counts[duration] = duration_counts.get(duration, 0) + 1
-            if year:
-                year_counts[year] = year_counts.get(year, 0) + 1
+        with phase('store'):
+            aggregates = get_store().aggregates()
         
         return jsonify({
             'success': True,
             'stats': {
-                'total_applications': len(internships),
-                'area_distribution': area_counts,
-                'duration_distribution': duration_counts,
-                'year_distribution': year_counts,
-                'recent_applications': len([i for i in internships if i['timestamp'].startswith(datetime.now().strftime("%Y-%m-%d"))])
+                'total_applications': aggregates.total('internships'),
+                'area_distribution': aggregates.distribution('internships', 'area'),
+                'duration_distribution': aggregates.distribution('internships', 'duration'),
+                'year_distribution': aggregates.distribution('internships', 'year'),
+                'recent_applications': aggregates.recent('internships')
             }
         })
         
@@ -143,6 +116,7 @@ def get_internship_stats():
         }), 500
 
 @training_bp.route('/training/areas', methods=['GET'])
+@cached_response(lambda: 0)
 def get_internship_areas():
     areas = [
         'frontend',
@@ -11,6 +11,10 @@ class FAQChat {
             "How much does training cost?",
             "Do you provide certificates?"
         ];
+        // Search results for the suggestions, fetched in one batch request.
+        this.preloaded = new Map();
+        this.autocompleteTimer = null;
+        this.autocompleteRequest = 0;
         
         this.init();
     }
@@ -47,6 +51,7 @@ class FAQChat {
                                 <div class="faq-suggestion-chips" id="faq-suggestion-chips"></div>
                             </div>
                             <div class="faq-input-area">
+                                <div class="faq-autocomplete" id="faq-autocomplete"></div>
                                 <div class="faq-input-container">
                                     <input type="text" class="faq-input" id="faq-input" placeholder="Type your question...">
                                     <button class="faq-send-btn" id="faq-send-btn">
@@ -87,8 +92,15 @@ class FAQChat {
             }
         });
         
+        input.addEventListener('keydown', (e) => {
+            if (e.key === 'Escape') {
+                this.hideAutocomplete();
+            }
+        });
+        
         input.addEventListener('input', () => {
             sendBtn.disabled = !input.value.trim();
+            this.scheduleAutocomplete(input.value);
         });
         
         document.addEventListener('click', (e) => {
@@ -118,6 +130,7 @@ class FAQChat {
         dropdown.classList.add('active');
         toggleBtn.style.transform = 'rotate(45deg)';
         this.isOpen = true;
+        this.preloadSuggestions();
         
         setTimeout(() => {
             document.getElementById('faq-input').focus();
@@ -174,12 +187,92 @@ class FAQChat {
         });
     }
     
+    async preloadSuggestions() {
+        if (this.preloaded.size) return;
+        
+        try {
+            const response = await fetch('/api/faq/search/batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ queries: this.suggestions })
+            });
+            
+            const data = await response.json();
+            
+            if (data.success) {
+                data.results.forEach(result => {
+                    this.preloaded.set(result.query, { success: true, results: result.results });
+                });
+            }
+        } catch (error) {
+            console.error('FAQ preload error:', error);
+        }
+    }
+    
+    scheduleAutocomplete(text) {
+        clearTimeout(this.autocompleteTimer);
+        
+        if (!text.trim()) {
+            this.hideAutocomplete();
+            return;
+        }
+        
+        this.autocompleteTimer = setTimeout(() => this.autocomplete(text), 80);
+    }
+    
+    async autocomplete(text) {
+        // Responses can arrive out of order; only the latest one is shown.
+        const requestId = ++this.autocompleteRequest;
+        
+        try {
+            const response = await fetch(`/api/faq/autocomplete?q=${encodeURIComponent(text)}`);
+            const data = await response.json();
+            
+            if (requestId !== this.autocompleteRequest) return;
+            
+            if (data.success && data.suggestions.length > 0) {
+                this.showAutocomplete(data.suggestions);
+            } else {
+                this.hideAutocomplete();
+            }
+        } catch (error) {
+            console.error('FAQ autocomplete error:', error);
+        }
+    }
+    
+    showAutocomplete(suggestions) {
+        const container = document.getElementById('faq-autocomplete');
+        container.innerHTML = '';
+        
+        suggestions.forEach(suggestion => {
+            const option = document.createElement('div');
+            option.className = 'faq-autocomplete-option';
+            option.textContent = suggestion.question;
+            option.addEventListener('click', () => this.askQuestion(suggestion.question));
+            container.appendChild(option);
+        });
+        
+        container.classList.add('active');
+    }
+    
+    hideAutocomplete() {
+        clearTimeout(this.autocompleteTimer);
+        this.autocompleteRequest++;
+        
+        const container = document.getElementById('faq-autocomplete');
+        container.classList.remove('active');
+        container.innerHTML = '';
+    }
+    
     async sendMessage() {
         const input = document.getElementById('faq-input');
         const message = input.value.trim();
         
         if (!message || this.isTyping) return;
         
+        this.hideAutocomplete();
         this.addMessage('user', message);
         input.value = '';
         document.getElementById('faq-send-btn').disabled = true;
@@ -187,15 +280,19 @@ class FAQChat {
         this.showTyping();
         
         try {
-            const response = await fetch('/api/faq/search', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ query: message })
-            });
+            let data = this.preloaded.get(message);
             
-            const data = await response.json();
+            if (!data) {
+                const response = await fetch('/api/faq/search', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ query: message })
+                });
+                
+                data = await response.json();
+            }
             
             this.hideTyping();
             
@@ -316,6 +413,30 @@ const additionalCSS = `
         background: #e9ecef;
         border-color: #6A3EE8;
     }
+    
+    .faq-autocomplete {
+        display: none;
+        margin-bottom: 10px;
+        border: 1px solid #e1e5e9;
+        border-radius: 12px;
+        overflow: hidden;
+    }
+    
+    .faq-autocomplete.active {
+        display: block;
+    }
+    
+    .faq-autocomplete-option {
+        padding: 8px 14px;
+        font-size: 0.85rem;
+        cursor: pointer;
+        transition: background 0.2s ease;
+    }
+    
+    .faq-autocomplete-option:hover {
+        background: #f8f9fa;
+        color: #6A3EE8;
+    }
 `;
 
 const style = document.createElement('style');
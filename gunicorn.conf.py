@@ -0,0 +1,33 @@
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Workers share the submission store through file locks and a shared version
+# counter, and each one catches up on the others' writes before it reads.
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_class = 'gthread'
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Import the app (FAQ index, submission log replay) once in the master.
+preload_app = True
+
+accesslog = '-' if os.environ.get('GUNICORN_ACCESS_LOG') else None
+errorlog = '-'
+
+# Each worker keeps its own metrics; they are added up through this directory,
+# so a scrape of /api/metrics covers every worker. It is emptied on start so
+# numbers from an earlier run are not counted again.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f'nirmaanify-metrics-{os.getpid()}'))
+
+
+def on_starting(server):
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['METRICS_DIR'])
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
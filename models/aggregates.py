@@ -0,0 +1,88 @@
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+
+# (collection, data field, skip empty values) for every maintained distribution
+DISTRIBUTIONS = (
+    ('services', 'service', False),
+    ('services', 'budget', True),
+    ('internships', 'area', False),
+    ('internships', 'duration', False),
+    ('internships', 'year', True),
+)
+
+
+class SubmissionAggregates:
+    """Counters the stats endpoints read instead of walking every submission.
+
+    ``add`` is O(1) per record and is called by the store on every write;
+    ``rebuild`` recomputes everything from a full document.
+    """
+
+    def __init__(self, document=None):
+        self._lock = threading.Lock()
+        self._reset()
+        if document is not None:
+            self.rebuild(document)
+
+    def _reset(self):
+        self.totals = Counter()
+        self.per_day = defaultdict(Counter)
+        self.distributions = {(collection, field): Counter() for collection, field, _ in DISTRIBUTIONS}
+
+    def _add(self, collection, record):
+        self.totals[collection] += 1
+        self.per_day[collection][record.get('timestamp', '')[:10]] += 1
+        data = record.get('data', {})
+        for dist_collection, field, skip_empty in DISTRIBUTIONS:
+            if dist_collection != collection:
+                continue
+            value = data.get(field)
+            if skip_empty and not value:
+                continue
+            self.distributions[(collection, field)][value] += 1
+
+    def add(self, collection, record):
+        with self._lock:
+            self._add(collection, record)
+
+    def rebuild(self, document):
+        with self._lock:
+            self._reset()
+            for collection, records in document.items():
+                for record in records:
+                    self._add(collection, record)
+
+    def total(self, collection):
+        return self.totals[collection]
+
+    def recent(self, collection, day=None):
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            return self.per_day[collection][day] if collection in self.per_day else 0
+
+    def distribution(self, collection, field):
+        with self._lock:
+            return dict(self.distributions[(collection, field)])
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'totals': dict(self.totals),
+                'per_day': {collection: dict(days) for collection, days in self.per_day.items()},
+                'distributions': {f'{collection}.{field}': dict(counts)
+                                  for (collection, field), counts in self.distributions.items()}
+            }
+
+
+def check_consistency(aggregates, document):
+    """Return a list of differences between ``aggregates`` and a full recompute."""
+    expected = SubmissionAggregates(document).snapshot()
+    actual = aggregates.snapshot()
+    mismatches = []
+    for section, values in expected.items():
+        for key in set(values) | set(actual[section]):
+            if values.get(key) != actual[section].get(key):
+                mismatches.append(f'{section}[{key}]: maintained={actual[section].get(key)!r} '
+                                  f'recomputed={values.get(key)!r}')
+    return mismatches
@@ -0,0 +1,365 @@
+from array import array
+from datetime import datetime
+from itertools import islice, repeat
+
+from models.aggregates import DISTRIBUTIONS
+
+# Form fields filled from a <select>: few distinct values, repeated on every submission.
+# Every field the stats endpoints count is one of them.
+CATEGORICAL_FIELDS = frozenset((
+    'service', 'budget', 'timeline', 'subject', 'urgency', 'area', 'availability', 'duration', 'year'
+)) | {field for _, field, _ in DISTRIBUTIONS}
+RECORD_KEYS = ('id', 'type', 'timestamp', 'data')
+_RECORD_KEY_SET = frozenset(RECORD_KEYS)
+_ABSENT = object()
+# select() filters this many rows at a time, so a page of matches near the
+# start of a large table does not wait for the whole table to be checked.
+SELECT_BLOCK = 4096
+# Records rebuilt for lookups are kept, up to this many per table.
+DECODED_CACHE_SIZE = 1024
+
+
+def _key(value):
+    # Strings are the common case; anything else is keyed with its type so 1, 1.0 and '1' stay apart.
+    return value if type(value) is str else (type(value), value)
+
+
+class Categorical:
+    """Dictionary-encoded column: a 2-byte code per row and a row count per code.
+
+    Each distinct value is stored once. Counting a value is a lookup in
+    ``counts`` instead of a pass over the rows. Code 0 marks rows that do
+    not have the field and is never counted. Codes widen to 4 bytes past
+    65536 distinct values.
+    """
+
+    __slots__ = ('codes', 'values', 'counts', '_codes_by_value')
+
+    def __init__(self):
+        self.codes = array('H')
+        self.values = [_ABSENT]
+        self.counts = [0]
+        self._codes_by_value = {}
+
+    def encode(self, value):
+        key = _key(value)
+        code = self._codes_by_value.get(key)
+        if code is None:
+            code = len(self.values)
+            if code == 1 << 16:
+                self.codes = array('I', self.codes)
+            self._codes_by_value[key] = code
+            self.values.append(value)
+            self.counts.append(0)
+        return code
+
+    def append(self, value):
+        code = self._codes_by_value.get(_key(value))
+        if code is None:
+            code = self.encode(value)
+        self.codes.append(code)
+        self.counts[code] += 1
+
+    def pad(self, count=1):
+        self.codes.extend(repeat(0, count))
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def count(self, value):
+        code = self._codes_by_value.get(_key(value))
+        return 0 if code is None else self.counts[code]
+
+    def value_counts(self):
+        return {value: count for value, count in zip(self.values[1:], self.counts[1:]) if count}
+
+
+class RecordTable:
+    """One collection's submissions stored column by column.
+
+    ``id`` and ``timestamp`` and free-text form fields are lists of
+    strings. ``type``, the day and the ``CATEGORICAL_FIELDS`` are
+    ``Categorical`` columns. The key order of each record and of its
+    ``data`` is kept as a dictionary-encoded ``shape``, so ``record()``
+    rebuilds the submission exactly as it was appended. A row whose layout
+    does not fit (extra top-level keys, non-dict ``data``, unhashable
+    select values) has no shape and is also kept whole in ``fallback``.
+
+    Scans do not need the records: ``select()`` filters on the columns,
+    ``data_keys()`` reads the field names from the shapes and ``rows()``
+    reads the values straight from the columns.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.timestamps = []
+        self.types = Categorical()
+        self.days = Categorical()
+        self.shapes = Categorical()
+        self.fields = {}
+        self.fallback = {}
+        self._plans = {}
+        self._decoded = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _column(self, field):
+        column = self.fields.get(field)
+        if column is None:
+            if field in CATEGORICAL_FIELDS:
+                column = Categorical()
+                column.pad(len(self.ids))
+            else:
+                column = [None] * len(self.ids)
+            self.fields[field] = column
+        return column
+
+    def append(self, record):
+        position = len(self.ids)
+        data = record.get('data', {})
+        exact = _RECORD_KEY_SET.issuperset(record) and isinstance(data, dict)
+        if not isinstance(data, dict):
+            data = {}
+        fields = self.fields
+        for field, value in data.items():
+            column = fields.get(field)
+            if column is None:
+                column = self._column(field)
+            if type(column) is list:
+                column.append(value)
+                continue
+            try:
+                column.append(value)
+            except TypeError:
+                # Unhashable select value: left out of the column, the row is kept whole.
+                column.pad()
+                exact = False
+        if len(data) != len(fields):
+            for column in fields.values():
+                if len(column) == position:
+                    if type(column) is list:
+                        column.append(None)
+                    else:
+                        column.pad()
+
+        timestamp = record.get('timestamp', '')
+        self.ids.append(record.get('id'))
+        self.timestamps.append(timestamp)
+        self.types.append(record.get('type'))
+        self.days.append(timestamp[:10] if isinstance(timestamp, str) else '')
+        if exact:
+            self.shapes.append((tuple(record), tuple(data)))
+        else:
+            self.shapes.pad()
+            self.fallback[position] = record
+        return position
+
+    def _plan(self, code):
+        # Per shape: each data field with its list column, or with the
+        # Categorical when the field is dictionary-encoded.
+        plan = self._plans.get(code)
+        if plan is None:
+            keys, data_keys = self.shapes.values[code]
+            plan = self._plans[code] = (keys == RECORD_KEYS, keys, tuple(
+                (field, column, None) if type(column) is list else (field, None, column)
+                for field, column in ((field, self.fields[field]) for field in data_keys)))
+        return plan
+
+    def record(self, position):
+        """A new dict equal to the record appended at ``position``."""
+        code = self.shapes.codes[position]
+        if not code:
+            return self.fallback[position]
+        ordered, keys, fields = self._plan(code)
+        data = {}
+        for field, strings, categorical in fields:
+            data[field] = strings[position] if categorical is None else \
+                categorical.values[categorical.codes[position]]
+        values = {
+            'id': self.ids[position],
+            'type': self.types.values[self.types.codes[position]],
+            'timestamp': self.timestamps[position],
+            'data': data
+        }
+        if ordered:
+            return values
+        return {key: values[key] for key in keys}
+
+    def cached_record(self, position):
+        """``record(position)``, kept for later lookups; the dict is shared and must not be mutated."""
+        record = self._decoded.get(position)
+        if record is None:
+            if len(self._decoded) >= DECODED_CACHE_SIZE:
+                del self._decoded[next(iter(self._decoded))]
+            record = self._decoded[position] = self.record(position)
+        return record
+
+    def _field_test(self, field, value):
+        # (codes, accepted codes) for a Categorical, (strings, None) for a
+        # list column, None when no row has the field.
+        column = self.fields.get(field)
+        if column is None:
+            return None
+        if type(column) is list:
+            return column, None
+        values = column.values
+        accepted = {code for code in range(1, len(values)) if str(values[code]) == value}
+        if value == '':
+            accepted.add(0)
+        return column.codes, accepted
+
+    def select(self, query, start=0, end=None):
+        """Positions in ``[start, end)`` whose record ``query.matches``, in order.
+
+        Timestamps and form fields are compared on the columns and only
+        rows kept in ``fallback`` are checked on the record itself.
+        """
+        end = len(self) if end is None else end
+        if not (query.since or query.until or query.fields):
+            return iter(range(start, end))
+        return self._select(query, start, end)
+
+    def _select(self, query, start, end):
+        timestamps = self.timestamps
+        fallback = self.fallback
+        since, until = query.since, query.until
+        tests = [(value, self._field_test(field, value)) for field, value in query.fields.items()]
+        # A free-text None is either a missing field ('') or a real None
+        # ('None'); rows left after such a filter are checked on the record.
+        recheck = any(test is not None and test[1] is None and value in ('', 'None') for value, test in tests)
+        for block in range(start, end, SELECT_BLOCK):
+            positions = range(block, min(block + SELECT_BLOCK, end))
+            if since:
+                positions = [p for p in positions if not timestamps[p] < since]
+            if until:
+                size = len(until)
+                positions = [p for p in positions if not timestamps[p][:size] > until]
+            for value, test in tests:
+                if test is None:
+                    if value != '':
+                        positions = [p for p in positions if p in fallback]
+                    continue
+                column, accepted = test
+                if accepted is None:
+                    blank = value in ('', 'None')
+                    positions = [p for p in positions if p in fallback or (
+                        blank if column[p] is None else str(column[p]) == value)]
+                else:
+                    positions = [p for p in positions if column[p] in accepted or p in fallback]
+            if recheck:
+                positions = [p for p in positions if query.matches(self.record(p))]
+            elif fallback:
+                positions = [p for p in positions if p not in fallback or query.matches(fallback[p])]
+            yield from positions
+
+    def data_keys(self, positions):
+        """Form fields of the rows at ``positions``, in the order they first appear."""
+        fields = {}
+        codes = self.shapes.codes
+        shapes = self.shapes.values
+        seen = set()
+        for position in positions:
+            code = codes[position]
+            if not code:
+                fields.update(dict.fromkeys(self.fallback[position].get('data', ())))
+            elif code not in seen:
+                seen.add(code)
+                fields.update(dict.fromkeys(shapes[code][1]))
+        return list(fields)
+
+    def rows(self, positions, fields):
+        """``(id, type, timestamp, *fields)`` for each position, None where a field is missing."""
+        columns = []
+        for field in fields:
+            column = self.fields.get(field)
+            if column is None:
+                columns.append((None, None))
+            elif type(column) is list:
+                columns.append((column, None))
+            else:
+                columns.append((column.codes, [None] + column.values[1:]))
+        shapes = self.shapes.codes
+        ids, timestamps = self.ids, self.timestamps
+        types, type_values = self.types.codes, self.types.values
+        positions = iter(positions)
+        # Read a block of rows one column at a time, then zip the columns into rows.
+        while True:
+            block = list(islice(positions, SELECT_BLOCK))
+            if not block:
+                return
+            values = [[ids[p] for p in block], [type_values[types[p]] for p in block],
+                      [timestamps[p] for p in block]]
+            for column, decoded in columns:
+                if column is None:
+                    values.append(repeat(None))
+                elif decoded is None:
+                    values.append([column[p] for p in block])
+                else:
+                    values.append([decoded[column[p]] for p in block])
+            for position, row in zip(block, zip(*values)):
+                if not shapes[position]:
+                    record = self.fallback[position]
+                    data = record.get('data', {})
+                    yield ((record.get('id'), record.get('type'), record.get('timestamp'))
+                           + tuple(data.get(field) for field in fields))
+                else:
+                    yield row
+
+    def value_counts(self, field):
+        """Rows per value of the categorical ``field``; rows without it are not counted."""
+        column = self.fields.get(field)
+        return column.value_counts() if column is not None else {}
+
+
+class ColumnarAggregates:
+    """The ``SubmissionAggregates`` interface answered from ``RecordTable`` code counts.
+
+    The tables keep a count per distinct value as rows are appended, so
+    totals, per-day counts and distributions never look at the rows.
+    """
+
+    def __init__(self, tables, lock):
+        self._tables = tables
+        self._lock = lock
+
+    def total(self, collection):
+        return len(self._tables[collection])
+
+    def recent(self, collection, day=None):
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            return self._tables[collection].days.count(day)
+
+    def _distribution(self, collection, field, skip_empty):
+        table = self._tables[collection]
+        counts = table.value_counts(field)
+        if skip_empty:
+            return {value: count for value, count in counts.items() if value}
+        # Like SubmissionAggregates, count submissions without the field under None.
+        missing = len(table) - sum(counts.values())
+        if missing:
+            counts[None] = counts.get(None, 0) + missing
+        return counts
+
+    def distribution(self, collection, field):
+        for dist_collection, dist_field, skip_empty in DISTRIBUTIONS:
+            if (dist_collection, dist_field) == (collection, field):
+                break
+        else:
+            raise KeyError((collection, field))
+        with self._lock:
+            return self._distribution(collection, field, skip_empty)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'totals': {collection: len(table) for collection, table in self._tables.items() if len(table)},
+                'per_day': {collection: table.days.value_counts()
+                            for collection, table in self._tables.items() if len(table)},
+                'distributions': {f'{collection}.{field}': self._distribution(collection, field, skip_empty)
+                                  for collection, field, skip_empty in DISTRIBUTIONS}
+            }
@@ -0,0 +1,370 @@
+import bisect
+import hashlib
+import heapq
+import importlib.util
+import itertools
+import math
+import os
+import pickle
+import re
+import zlib
+from collections import Counter
+
+# NumPy takes longer to import than the rest of the app, so it is only
+# imported when the first dense index is built or loaded.
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+np = None
+
+DENSE_DIM = int(os.environ.get('FAQ_DENSE_DIM', 256))
+# FAQs an autocomplete may look at beyond the ones it returns.
+PREFIX_MAX_CANDIDATES = int(os.environ.get('FAQ_AUTOCOMPLETE_MAX_CANDIDATES', 256))
+SNAPSHOT_FORMAT = 4
+SNAPSHOT_FILE = 'index.pickle'
+DENSE_PREFIX = 'dense'
+
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+
+def tokenize(text):
+    return _NON_ALNUM_RE.sub('', text.lower()).split()
+
+
+def faq_document(faq):
+    return f"{faq['question']} {faq['answer']} {' '.join(faq.get('keywords', []))}"
+
+
+class FAQIndex:
+    """BM25 inverted index over FAQ question, answer and keyword text.
+
+    Documents are tokenized once at build time. A query only touches the
+    postings of its own terms, and scores are normalized by the best score
+    the query could reach, so they fall in [0, 1) like the old Jaccard score.
+    """
+
+    def __init__(self, faqs, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(faqs)
+        self.postings = {}
+        lengths = []
+        for doc_id, faq in enumerate(faqs):
+            terms = Counter(tokenize(faq_document(faq)))
+            lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+        avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        # Precompute the length part of the BM25 denominator per document.
+        self.length_norms = [k1 * (1 - b + b * length / avg_length) if avg_length else k1
+                             for length in lengths]
+        self.idf = {term: self._idf(len(postings)) for term, postings in self.postings.items()}
+
+    def _idf(self, df):
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def scores(self, query):
+        """Return ``{doc_id: normalized score}`` for every FAQ sharing a term with ``query``."""
+        terms = set(tokenize(query))
+        if not terms or not self.size:
+            return {}
+
+        # Unknown terms still count towards the maximum, so a query that is
+        # mostly unmatched words scores lower, as it did with Jaccard.
+        max_score = sum(self.idf.get(term) or self._idf(0) for term in terms) * (self.k1 + 1)
+        scores = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = self.idf[term] * (self.k1 + 1) / max_score
+            length_norms = self.length_norms
+            for doc_id, tf in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + length_norms[doc_id])
+        return scores
+
+    def search(self, query, top_k=3, threshold=0.0):
+        """Return ``[(doc_id, score), ...]`` best first, keeping scores above ``threshold``."""
+        scores = self.scores(query)
+        best = heapq.nlargest(top_k, ((score, doc_id) for doc_id, score in scores.items() if score > threshold))
+        return [(doc_id, score) for score, doc_id in best]
+
+
+class PrefixIndex:
+    """Sorted-prefix index over FAQ questions and keywords for autocomplete.
+
+    ``questions`` holds each normalized question, sorted, so the FAQs whose
+    question starts with the typed text are one bisect away. ``words`` holds
+    every question and keyword term, sorted, next to the ascending ids of the
+    FAQs containing it. The word being typed is matched by prefix and the
+    words before it must match exactly. Those words are matched by
+    intersecting sorted postings, driven by whichever side has fewer FAQs.
+    At most ``max_candidates`` FAQs are examined per completion. For very
+    common words, completions can therefore miss matches, but the cost stays
+    bounded however many FAQs there are.
+    """
+
+    def __init__(self, faqs, max_candidates=PREFIX_MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+        self.questions = sorted((' '.join(tokenize(faq['question'])), doc_id) for doc_id, faq in enumerate(faqs))
+        postings = {}
+        self.doc_terms = []
+        for doc_id, faq in enumerate(faqs):
+            terms = sorted(set(tokenize(f"{faq['question']} {' '.join(faq.get('keywords', []))}")))
+            self.doc_terms.append(tuple(terms))
+            for term in terms:
+                postings.setdefault(term, []).append(doc_id)
+        self.words = sorted(postings)
+        self.postings = [postings[word] for word in self.words]
+        # Running total of postings, so the FAQ count of a range of words is one subtraction.
+        self.offsets = [0]
+        for word_postings in self.postings:
+            self.offsets.append(self.offsets[-1] + len(word_postings))
+
+    def _postings(self, term):
+        position = bisect.bisect_left(self.words, term)
+        if position < len(self.words) and self.words[position] == term:
+            return self.postings[position]
+        return []
+
+    def _prefix_range(self, partial):
+        # Tokens are [a-z0-9], so every word starting with partial sorts below partial + '~'.
+        return bisect.bisect_left(self.words, partial), bisect.bisect_left(self.words, partial + '~')
+
+    def _has_prefix(self, doc_id, partial):
+        terms = self.doc_terms[doc_id]
+        position = bisect.bisect_left(terms, partial)
+        return position < len(terms) and terms[position].startswith(partial)
+
+    @staticmethod
+    def _intersect(driver, others):
+        # Streaming intersection of ascending postings: each list is only
+        # ever searched forward from where the previous FAQ was found.
+        positions = [0] * len(others)
+        for doc_id in driver:
+            for i, postings in enumerate(others):
+                position = positions[i] = bisect.bisect_left(postings, doc_id, positions[i])
+                if position == len(postings) or postings[position] != doc_id:
+                    break
+            else:
+                yield doc_id
+
+    def _word_matches(self, complete, partial):
+        start, end = self._prefix_range(partial)
+        if not complete:
+            # Every word in the range has at least one FAQ, so this stops within ``limit`` words.
+            for position in range(start, end):
+                yield from self.postings[position]
+            return
+        postings = sorted((self._postings(term) for term in complete), key=len)
+        if not postings[0] or start == end:
+            return
+        if end - start <= self.max_candidates and self.offsets[end] - self.offsets[start] < len(postings[0]):
+            # Fewer FAQs have a word starting with the partial word than have the rarest typed word.
+            merged = (doc_id for doc_id, _ in itertools.groupby(heapq.merge(*self.postings[start:end])))
+            candidates = self._intersect(itertools.islice(merged, self.max_candidates), postings)
+        else:
+            candidates = (doc_id for doc_id in self._intersect(
+                itertools.islice(postings[0], self.max_candidates), postings[1:])
+                if self._has_prefix(doc_id, partial))
+        yield from candidates
+
+    def complete(self, text, limit=5):
+        """Return up to ``limit`` doc ids for the partly typed ``text``.
+
+        FAQs whose question starts with the text come first. After them
+        come FAQs that contain every typed word, with the last word allowed
+        to be unfinished.
+        """
+        terms = tokenize(text)
+        if not terms or limit <= 0:
+            return []
+        phrase = ' '.join(terms)
+        results = []
+        questions = self.questions
+        for position in range(bisect.bisect_left(questions, (phrase,)), len(questions)):
+            question, doc_id = questions[position]
+            if len(results) == limit or not question.startswith(phrase):
+                break
+            results.append(doc_id)
+        if len(results) == limit:
+            return results
+
+        seen = set(results)
+        for doc_id in self._word_matches(terms[:-1], terms[-1]):
+            if doc_id not in seen:
+                seen.add(doc_id)
+                results.append(doc_id)
+                if len(results) == limit:
+                    break
+        return results
+
+
+def load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _word_features(word):
+    yield word
+    padded = f'#{word}#'
+    for i in range(len(padded) - 2):
+        yield padded[i:i + 3]
+
+
+def top_k_scores(scores, top_k, threshold):
+    if top_k < len(scores):
+        candidates = np.argpartition(scores, len(scores) - top_k)[-top_k:]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [(int(doc_id), float(scores[doc_id])) for doc_id in candidates if scores[doc_id] > threshold]
+
+
+class DenseFAQIndex:
+    """Hashed TF-IDF vectors of FAQ words and their character trigrams.
+
+    Every FAQ is one L2-normalized vector, stored feature-major: ``columns``
+    is a contiguous float32 ``dim x size`` matrix with one row per hash
+    bucket. A query's words only hash to a few buckets (10-30 of ``dim`` for
+    a short question), so scoring reads those rows instead of the whole
+    matrix and then picks the top hits with ``argpartition``. Runs on CPU
+    with NumPy only; the matrix can be saved and memory-mapped back.
+    """
+
+    def __init__(self, faqs, dim=DENSE_DIM, columns=None, idf=None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError('numpy is required for dense FAQ search')
+        load_numpy()
+        self.dim = dim
+        self._feature_buckets = {}
+        if columns is None:
+            columns, idf = self._build(faqs)
+        self.columns = columns
+        self.idf = idf
+        self.size = columns.shape[1]
+
+    def _word_buckets(self, word):
+        hashed = self._feature_buckets.get(word)
+        if hashed is None:
+            hashed = []
+            for feature in _word_features(word):
+                digest = zlib.crc32(feature.encode('utf-8'))
+                hashed.append((digest % self.dim, 1.0 if digest & 0x80000000 else -1.0))
+            if len(self._feature_buckets) < 1_000_000:
+                self._feature_buckets[word] = hashed
+        return hashed
+
+    def _hashed(self, text):
+        buckets = {}
+        for word, count in Counter(tokenize(text)).items():
+            weight = 1 + math.log(count)
+            for bucket, sign in self._word_buckets(word):
+                buckets[bucket] = buckets.get(bucket, 0.0) + sign * weight
+        return buckets
+
+    def _build(self, faqs):
+        columns = np.zeros((self.dim, len(faqs)), dtype=np.float32)
+        for doc_id, faq in enumerate(faqs):
+            buckets = self._hashed(faq_document(faq))
+            columns[list(buckets), doc_id] = list(buckets.values())
+        df = np.count_nonzero(columns, axis=1)
+        idf = np.log(1 + (len(faqs) + 1) / (df + 1)).astype(np.float32)
+        columns *= idf[:, None]
+        norms = np.linalg.norm(columns, axis=0)
+        columns /= np.where(norms == 0, 1, norms)
+        return columns, idf
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        buckets = self._hashed(text)
+        vector[list(buckets)] = list(buckets.values())
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, query):
+        vector = self.embed(query)
+        buckets = np.flatnonzero(vector)
+        if not len(buckets):
+            return np.zeros(self.size, dtype=np.float32)
+        scores = self.columns[buckets[0]] * vector[buckets[0]]
+        for bucket in buckets[1:]:
+            scores += vector[bucket] * self.columns[bucket]
+        return scores
+
+    def search(self, query, top_k=3, threshold=0.0):
+        if not self.size:
+            return []
+        return top_k_scores(self.scores(query), top_k, threshold)
+
+    def save(self, prefix):
+        np.save(f'{prefix}.columns.npy', self.columns)
+        np.save(f'{prefix}.idf.npy', self.idf)
+
+    @classmethod
+    def load(cls, prefix, mmap=True):
+        load_numpy()
+        columns = np.load(f'{prefix}.columns.npy', mmap_mode='r' if mmap else None)
+        idf = np.load(f'{prefix}.idf.npy')
+        return cls(None, dim=columns.shape[0], columns=columns, idf=idf)
+
+
+def hybrid_search(keyword_index, dense_index, query, top_k=3, threshold=0.0, alpha=0.5):
+    """Blend dense cosine scores with keyword scores: ``alpha * dense + (1 - alpha) * keyword``."""
+    if not dense_index.size:
+        return []
+    scores = np.clip(dense_index.scores(query), 0, None) * alpha
+    for doc_id, score in keyword_index.scores(query).items():
+        scores[doc_id] += (1 - alpha) * score
+    return top_k_scores(scores, top_k, threshold)
+
+
+def faq_digest(payload):
+    """Identify the ``faqs.json`` contents a snapshot was built from."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def save_snapshot(directory, faqs, digest, dense=True):
+    """Write the FAQs, their BM25 and prefix indexes (plus the dense matrix) for ``load_snapshot``.
+
+    The pickle is written last, so a half-written snapshot is never loaded.
+    """
+    os.makedirs(directory, exist_ok=True)
+    has_dense = dense and NUMPY_AVAILABLE
+    if has_dense:
+        DenseFAQIndex(faqs).save(os.path.join(directory, DENSE_PREFIX))
+    state = {
+        'format': SNAPSHOT_FORMAT,
+        'digest': digest,
+        'faqs': faqs,
+        'index': FAQIndex(faqs),
+        'prefix_index': PrefixIndex(faqs),
+        'dense_dim': DENSE_DIM if has_dense else None
+    }
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def load_snapshot(directory, digest):
+    """Return ``(faqs, index, prefix_index, dense_prefix)`` if ``directory`` holds a snapshot of ``digest``.
+
+    ``dense_prefix`` is None when the snapshot has no usable dense matrix.
+    Snapshots are pickles written by ``scripts/build_faq_snapshot.py`` at
+    build time; never point this at files from anywhere else.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT_FILE), 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if state.get('format') != SNAPSHOT_FORMAT or state.get('digest') != digest:
+        return None
+    dense_prefix = os.path.join(directory, DENSE_PREFIX)
+    if state['dense_dim'] != DENSE_DIM or not os.path.exists(f'{dense_prefix}.columns.npy'):
+        dense_prefix = None
+    return state['faqs'], state['index'], state['prefix_index'], dense_prefix
@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from datetime import datetime
+
+from models.aggregates import DISTRIBUTIONS
+from models.submission_store import (COLLECTIONS, DATA_DIR, DATA_FILE, LOG_DIR, MAX_BATCH, DuplicateSubmissionError,
+                                     GroupCommitWriter, PendingWrite, SubmissionStore, empty_document,
+                                     has_submission_log)
+from utils import json_codec
+
+SQLITE_FILE = os.environ.get('SQLITE_FILE', os.path.join(DATA_DIR, 'submissions.db'))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 10))
+PAGE_SIZE = 500
+
+# Form fields the stats endpoints group by get their own indexed column.
+FIELD_COLUMNS = tuple(sorted({field for _, field, _ in DISTRIBUTIONS}))
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS submissions (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL,
+        collection TEXT NOT NULL,
+        type TEXT,
+        timestamp TEXT NOT NULL,
+        day TEXT NOT NULL,
+        record TEXT NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS submissions_id ON submissions (id)',
+    'CREATE INDEX IF NOT EXISTS submissions_type ON submissions (type)',
+    'CREATE INDEX IF NOT EXISTS submissions_collection_seq ON submissions (collection, seq)',
+    'CREATE INDEX IF NOT EXISTS submissions_collection_day ON submissions (collection, day)',
+    'CREATE INDEX IF NOT EXISTS submissions_collection_timestamp ON submissions (collection, timestamp)',
+]
+
+
+class _ConnectionOwner:
+    # Lives only in a thread's local storage, so it is freed when the thread ends.
+    __slots__ = ('__weakref__',)
+
+
+class SQLiteAggregates:
+    """Stats for one version of the database, computed with ``GROUP BY``.
+
+    Each query runs at most once per version; the store hands out a new
+    instance after every write.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def _query(self, key, sql, params=()):
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        rows = self._store._connection().execute(sql, params).fetchall()
+        with self._lock:
+            self._results[key] = rows
+        return rows
+
+    def _totals(self):
+        return dict(self._query('totals', 'SELECT collection, COUNT(*) FROM submissions GROUP BY collection'))
+
+    def total(self, collection):
+        return self._totals().get(collection, 0)
+
+    def recent(self, collection, day=None):
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        rows = self._query(('recent', collection, day),
+                           'SELECT COUNT(*) FROM submissions WHERE collection = ? AND day = ?', (collection, day))
+        return rows[0][0]
+
+    def distribution(self, collection, field):
+        for dist_collection, dist_field, skip_empty in DISTRIBUTIONS:
+            if (dist_collection, dist_field) == (collection, field):
+                break
+        else:
+            raise KeyError((collection, field))
+        skip = f' AND "{field}" IS NOT NULL AND "{field}" != \'\'' if skip_empty else ''
+        rows = self._query(('distribution', collection, field),
+                           f'SELECT "{field}", COUNT(*) FROM submissions WHERE collection = ?{skip} '
+                           f'GROUP BY "{field}"', (collection,))
+        return dict(rows)
+
+    def snapshot(self):
+        per_day = {}
+        for collection, day, count in self._query(
+                'per_day', 'SELECT collection, day, COUNT(*) FROM submissions GROUP BY collection, day'):
+            per_day.setdefault(collection, {})[day] = count
+        return {
+            'totals': self._totals(),
+            'per_day': per_day,
+            'distributions': {f'{collection}.{field}': self.distribution(collection, field)
+                              for collection, field, _ in DISTRIBUTIONS}
+        }
+
+
+class SQLiteSubmissionStore(SubmissionStore):
+    """Submissions in an embedded SQLite database in WAL mode.
+
+    One row per submission holds the record as JSON, plus indexed columns
+    for the fields that listings and stats filter or group by. Each thread
+    gets its own connection, closed again when the thread ends; writes still go through the group-commit
+    writer, so a batch is one transaction. ``seq`` only grows, which makes
+    ``MAX(seq)`` the store version and the listing cursor position, and
+    lets writes from other processes show up on the next read.
+    """
+
+    def __init__(self, path=SQLITE_FILE, import_file=DATA_FILE, log_dir=LOG_DIR):
+        self.path = path
+        self._local = threading.local()
+        self._connections = {}
+        # Reentrant: a finalizer can run from garbage collection while the lock is held.
+        self._connections_lock = threading.RLock()
+        self._aggregates_cache = (None, None)
+        self._writer = GroupCommitWriter(self._commit, 'submission-sqlite-writer')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self._ensure_field_columns(conn)
+        if self.version() is None:
+            # submissions.json stops being updated once the log store has
+            # taken over, so seeding from it would silently drop newer data.
+            if log_dir and has_submission_log(log_dir):
+                self.close()
+                raise RuntimeError(f'{path} is empty but {log_dir} holds submissions; run '
+                                   f'python scripts/migrate_to_sqlite.py to copy them before using SUBMISSION_STORE=sqlite')
+            if import_file and os.path.exists(import_file):
+                with open(import_file, 'r', encoding='utf-8') as f:
+                    self.import_document(json.load(f))
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection must not be used again after a fork.
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA synchronous=FULL')
+            owner = _ConnectionOwner()
+            self._local.conn = conn
+            self._local.owner = owner
+            self._local.pid = os.getpid()
+            with self._connections_lock:
+                self._connections[id(conn)] = conn
+            weakref.finalize(owner, self._release, conn, os.getpid()).atexit = False
+        return conn
+
+    def _release(self, conn, pid):
+        with self._connections_lock:
+            if self._connections.pop(id(conn), None) is None:
+                return
+        # A connection inherited through a fork belongs to the parent; only forget it.
+        if pid == os.getpid():
+            conn.close()
+
+    def _ensure_field_columns(self, conn):
+        existing = {row[1] for row in conn.execute('PRAGMA table_info(submissions)')}
+        for field in FIELD_COLUMNS:
+            if field in existing:
+                continue
+            conn.execute(f'ALTER TABLE submissions ADD COLUMN "{field}" TEXT')
+            conn.execute(f'UPDATE submissions SET "{field}" = json_extract(record, \'$.data.{field}\')')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS submissions_{field} ON submissions (collection, "{field}")')
+
+    def _row(self, collection, record):
+        timestamp = record.get('timestamp', '')
+        data = record.get('data', {})
+        return ((record.get('id'), collection, record.get('type'), timestamp, timestamp[:10],
+                 json_codec.dumps(record).decode('utf-8'))
+                + tuple(data.get(field) for field in FIELD_COLUMNS))
+
+    def _commit(self, batch, check_duplicates=True):
+        columns = ', '.join(['id', 'collection', 'type', 'timestamp', 'day', 'record']
+                            + [f'"{field}"' for field in FIELD_COLUMNS])
+        placeholders = ', '.join('?' * (6 + len(FIELD_COLUMNS)))
+        insert = f'INSERT INTO submissions ({columns}) VALUES ({placeholders})'
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for pending in batch:
+                submission_id = pending.record.get('id')
+                if check_duplicates and conn.execute('SELECT 1 FROM submissions WHERE id = ?',
+                                                     (submission_id,)).fetchone():
+                    pending.error = DuplicateSubmissionError(f'Duplicate submission id: {submission_id}')
+                    continue
+                conn.execute(insert, self._row(pending.collection, pending.record))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def import_document(self, document):
+        # Legacy files can hold same-second duplicate IDs; keep every record.
+        batch = [PendingWrite(collection, record)
+                 for collection in COLLECTIONS for record in document.get(collection, [])]
+        for start in range(0, len(batch), MAX_BATCH):
+            self._commit(batch[start:start + MAX_BATCH], check_duplicates=False)
+
+    def version(self):
+        return self._connection().execute('SELECT MAX(seq) FROM submissions').fetchone()[0]
+
+    def load(self):
+        document = empty_document()
+        for collection, record in self._connection().execute(
+                'SELECT collection, record FROM submissions ORDER BY seq'):
+            document.setdefault(collection, []).append(json_codec.loads(record))
+        return document
+
+    def aggregates(self):
+        version = self.version()
+        cached_version, aggregates = self._aggregates_cache
+        if aggregates is None or cached_version != version:
+            aggregates = SQLiteAggregates(self)
+            self._aggregates_cache = (version, aggregates)
+        return aggregates
+
+    def iter_records(self, collection, start=0):
+        # Fetch in pages so a slow consumer never holds a read transaction open.
+        conn = self._connection()
+        while True:
+            rows = conn.execute('SELECT seq, record FROM submissions WHERE collection = ? AND seq >= ? '
+                                'ORDER BY seq LIMIT ?', (collection, start, PAGE_SIZE)).fetchall()
+            for seq, record in rows:
+                yield seq, json_codec.loads(record)
+            if len(rows) < PAGE_SIZE:
+                return
+            start = rows[-1][0] + 1
+
+    def _lookup(self, submission_id):
+        row = self._connection().execute('SELECT collection, record FROM submissions WHERE id = ? '
+                                         'ORDER BY seq LIMIT 1', (submission_id,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json_codec.loads(row[1])
+
+    def close(self):
+        self._writer.stop()
+        with self._connections_lock:
+            connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,717 @@
+import json
+import mmap
+import os
+import queue
+import re
+import secrets
+import struct
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): the stores are then only safe within one process.
+    fcntl = None
+
+from models.aggregates import SubmissionAggregates
+from models.columnar import ColumnarAggregates, RecordTable
+from utils import json_codec
+from utils.metrics import STORE_SECONDS, timed
+
+DATA_DIR = os.environ.get('DATA_DIR', 'data')
+DATA_FILE = os.path.join(DATA_DIR, 'submissions.json')
+LOG_DIR = os.path.join(DATA_DIR, 'submissions_log')
+COLLECTIONS = ('contacts', 'services', 'internships')
+
+SEGMENT_MAX_BYTES = int(os.environ.get('SUBMISSION_SEGMENT_MAX_BYTES', 4 * 1024 * 1024))
+COMPACT_AFTER_SEGMENTS = int(os.environ.get('SUBMISSION_COMPACT_AFTER_SEGMENTS', 4))
+MAX_BATCH = int(os.environ.get('SUBMISSION_MAX_BATCH', 512))
+
+_SEGMENT_RE = re.compile(r'^(segment|compacted)-(\d{8})\.log$')
+
+
+def empty_document():
+    return {collection: [] for collection in COLLECTIONS}
+
+
+def build_index(document):
+    index = {}
+    for collection in COLLECTIONS:
+        for record in document.get(collection, []):
+            index.setdefault(record.get('id'), (collection, record))
+    return index
+
+
+def atomic_write(path, payload):
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FileLock:
+    """Advisory ``fcntl`` lock on ``path``, shared by every process that opens it.
+
+    ``flock`` does not exclude threads that share a file description, so a
+    thread lock is taken first. Holding the lock again from the same thread
+    is a no-op, and each process opens its own descriptor after a fork.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self._pid = None
+
+    @contextmanager
+    def hold(self, exclusive=True):
+        with self._thread_lock:
+            if self._depth == 0 and fcntl is not None:
+                if self._pid != os.getpid():
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    self._pid = os.getpid()
+                fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class SharedVersion:
+    """Commit counter in an 8-byte sidecar file that every process maps.
+
+    Writers bump it while holding the store's ``FileLock``. Readers compare
+    it with the value their in-memory state was built from, which costs
+    one memory read instead of a system call.
+    """
+
+    def __init__(self, path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < 8:
+                os.ftruncate(fd, 8)
+            self._map = mmap.mmap(fd, 8)
+        finally:
+            os.close(fd)
+
+    def read(self):
+        return struct.unpack_from('<Q', self._map)[0]
+
+    def bump(self):
+        value = self.read() + 1
+        struct.pack_into('<Q', self._map, 0, value)
+        return value
+
+    def close(self):
+        self._map.close()
+
+
+class PendingWrite:
+    __slots__ = ('collection', 'record', 'done', 'error')
+
+    def __init__(self, collection, record):
+        self.collection = collection
+        self.record = record
+        self.done = threading.Event()
+        self.error = None
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits appends from many threads in batches.
+
+    Callers block until the batch holding their record is durable, so a
+    request never reports success for a submission that is not on disk.
+    """
+
+    def __init__(self, commit, name, max_batch=MAX_BATCH):
+        self._commit = commit
+        self._name = name
+        self.max_batch = max_batch
+        self._start_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            # A forked worker inherits the queue but not the thread that drains it.
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, collection, record):
+        self._ensure_started()
+        pending = PendingWrite(collection, record)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def _run(self):
+        pending_queue = self._queue
+        running = True
+        while running:
+            batch = []
+            item = pending_queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = pending_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if item is None:
+                running = False
+            if not batch:
+                continue
+            try:
+                with timed(STORE_SECONDS, 'commit'):
+                    self._commit(batch)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            for pending in batch:
+                pending.done.set()
+
+    def stop(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class DuplicateSubmissionError(ValueError):
+    pass
+
+
+class SubmissionStore:
+    """Interface shared by every submission backend.
+
+    ``load_cached`` keeps the last parsed document and reuses it until
+    ``version()`` changes, so repeated reads of an unchanged store are free.
+    Documents returned from it are shared and must not be mutated. Backends
+    that answer reads from their own structures (the log and SQLite stores)
+    never call ``_init_cache`` and report no cache stats.
+    """
+
+    _cache_lock = None
+
+    def _init_cache(self):
+        self._cache_lock = threading.Lock()
+        self._cached_version = None
+        self._cached_document = None
+        self._cached_index = None
+        self._cached_aggregates = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def version(self):
+        raise NotImplementedError
+
+    def load_cached(self):
+        version = self.version()
+        with self._cache_lock:
+            if self._cached_document is not None and self._cached_version == version:
+                self.cache_hits += 1
+                return self._cached_document
+            self.cache_misses += 1
+        with timed(STORE_SECONDS, 'load'):
+            document = self.load()
+        with self._cache_lock:
+            self._cached_version = version
+            self._cached_document = document
+            self._cached_index = None
+            self._cached_aggregates = None
+        return document
+
+    def aggregates(self):
+        document = self.load_cached()
+        with self._cache_lock:
+            aggregates = self._cached_aggregates
+            if aggregates is None or self._cached_document is not document:
+                aggregates = SubmissionAggregates(document)
+                if self._cached_document is document:
+                    self._cached_aggregates = aggregates
+        return aggregates
+
+    def _lookup(self, submission_id):
+        document = self.load_cached()
+        with self._cache_lock:
+            index = self._cached_index
+            if index is None or self._cached_document is not document:
+                index = build_index(document)
+                if self._cached_document is document:
+                    self._cached_index = index
+        return index.get(submission_id)
+
+    def iter_records(self, collection, start=0):
+        records = self.load_cached().get(collection, [])
+        for position in range(start, len(records)):
+            yield position, records[position]
+
+    def iter_matching(self, collection, start, query):
+        """``(position, record)`` for the records from ``start`` on that ``query`` matches."""
+        for position, record in self.iter_records(collection, start):
+            if query.matches(record):
+                yield position, record
+
+    def data_fields(self, collection, query):
+        """Form fields of the records ``query`` matches, in the order they first appear."""
+        fields = {}
+        for _, record in self.iter_matching(collection, 0, query):
+            fields.update(dict.fromkeys(record.get('data', ())))
+        return list(fields)
+
+    def iter_rows(self, collection, query, fields):
+        """``(id, type, timestamp, *fields)`` for every match, for tabular exports."""
+        for _, record in self.iter_matching(collection, 0, query):
+            data = record.get('data', {})
+            yield ((record.get('id'), record.get('type'), record.get('timestamp'))
+                   + tuple(data.get(field) for field in fields))
+
+    def get(self, collection, submission_id):
+        with timed(STORE_SECONDS, 'lookup'):
+            found = self._lookup(submission_id)
+        if found is None or found[0] != collection:
+            return None
+        return found[1]
+
+    def new_id(self, prefix):
+        while True:
+            submission_id = f'{prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{secrets.token_hex(4)}'
+            if self._lookup(submission_id) is None:
+                return submission_id
+
+    def cache_stats(self):
+        if self._cache_lock is None:
+            return None
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0
+            }
+
+    def append(self, collection, record):
+        if collection not in COLLECTIONS:
+            raise ValueError(f'Unknown collection: {collection}')
+        with timed(STORE_SECONDS, 'write'):
+            self._writer.submit(collection, record)
+
+    def _commit(self, batch):
+        raise NotImplementedError
+
+    def load(self):
+        raise NotImplementedError
+
+    def import_document(self, document):
+        for collection in COLLECTIONS:
+            for record in document.get(collection, []):
+                self.append(collection, record)
+
+    def close(self):
+        self._writer.stop()
+
+
+class JSONFileStore(SubmissionStore):
+    """Original layout: one JSON document rewritten per committed batch.
+
+    The document is published with write-to-temp and rename, so readers
+    always see either the previous or the next complete file.
+    """
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self._writer = GroupCommitWriter(self._commit, 'submission-json-writer')
+        self._writes = 0
+        self._init_cache()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file_lock = FileLock(f'{path}.lock')
+        with self._file_lock.hold():
+            if not os.path.exists(path):
+                self._save(empty_document())
+
+    def _save(self, data):
+        atomic_write(self.path, json_codec.dumps(data))
+        self._writes += 1
+
+    def version(self):
+        # mtime and size catch edits made outside this process.
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (self._writes, None, None)
+        return (self._writes, stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return json_codec.loads(f.read())
+        except FileNotFoundError:
+            return empty_document()
+
+    def _commit(self, batch):
+        # Read-modify-write under the file lock, so workers never drop each other's batches.
+        with self._file_lock.hold():
+            data = self.load()
+            ids = set(build_index(data))
+            for pending in batch:
+                submission_id = pending.record.get('id')
+                if submission_id in ids:
+                    pending.error = DuplicateSubmissionError(f'Duplicate submission id: {submission_id}')
+                    continue
+                ids.add(submission_id)
+                data.setdefault(pending.collection, []).append(pending.record)
+            self._save(data)
+
+
+class LogSubmissionStore(SubmissionStore):
+    """Append-only store: one JSON line per submission in size-capped segments.
+
+    State is rebuilt by replaying ``compacted-N.log`` followed by every
+    ``segment-M.log`` with ``M > N``. Sealed segments are merged into a new
+    compacted file by a background thread, so the active segment stays small.
+    Each committed batch is flushed and fsynced once.
+
+    Several processes (gunicorn workers) can share one log directory.
+    Writers hold an exclusive ``FileLock`` while they append and then bump
+    the ``SharedVersion`` counter. Every read first compares that counter
+    with the one this process last saw, and on a change replays only the
+    lines appended since, so each worker's records, ID index and stats
+    counters stay current without reloading the log.
+
+    In memory, each collection is a columnar ``RecordTable`` rather than a
+    list of dicts; records are rebuilt as dicts when they are read, and the
+    stats come from the tables' per-value counts. Filtered listings and
+    exports run on the columns and only rebuild the records they return.
+    """
+
+    def __init__(self, log_dir=LOG_DIR, import_file=DATA_FILE,
+                 segment_max_bytes=SEGMENT_MAX_BYTES,
+                 compact_after_segments=COMPACT_AFTER_SEGMENTS):
+        self.log_dir = log_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_after_segments = compact_after_segments
+        self._lock = threading.Lock()
+        self._writer = GroupCommitWriter(self._commit, 'submission-log-writer')
+        self._version = 0
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+        self._tables = {collection: RecordTable() for collection in COLLECTIONS}
+        self._index = {}
+        self._aggregates = ColumnarAggregates(self._tables, self._lock)
+        self._active = None
+        self._active_seq = 0
+        self._active_size = 0
+        # Where this process has replayed up to: (segment, byte offset), and how many lines.
+        self._position = (0, 0)
+        self._replayed = 0
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._file_lock = FileLock(os.path.join(log_dir, 'lock'))
+        with self._file_lock.hold():
+            self._shared_version = SharedVersion(os.path.join(log_dir, 'version'))
+            compacted, segments = self._scan()
+            if compacted is None and not segments and import_file and os.path.exists(import_file):
+                self._open_segment(1)
+                self._position = (1, 0)
+                with open(import_file, 'r', encoding='utf-8') as f:
+                    self.import_document(json.load(f))
+                return
+
+            if compacted is not None:
+                self._replay(self._path('compacted', compacted))
+                for seq in [s for s in segments if s <= compacted]:
+                    os.remove(self._path('segment', seq))
+                segments = [s for s in segments if s > compacted]
+            for seq in segments:
+                offset = self._replay(self._path('segment', seq), truncate_torn=seq == segments[-1])
+                self._position = (seq, offset)
+            if not segments:
+                self._position = ((compacted or 0) + 1, 0)
+            self._open_segment(self._position[0])
+            self._version = self._shared_version.read()
+
+    def _path(self, kind, seq):
+        return os.path.join(self.log_dir, f'{kind}-{seq:08d}.log')
+
+    def _scan(self):
+        compacted = None
+        segments = []
+        for name in os.listdir(self.log_dir):
+            match = _SEGMENT_RE.match(name)
+            if not match:
+                continue
+            seq = int(match.group(2))
+            if match.group(1) == 'compacted':
+                compacted = seq if compacted is None else max(compacted, seq)
+            else:
+                segments.append(seq)
+        return compacted, sorted(segments)
+
+    def _replay(self, path, offset=0, skip=0, truncate_torn=False):
+        """Add the complete lines of ``path`` after ``offset`` (and the first ``skip`` lines).
+
+        Returns the offset just past the last complete line. Another process
+        may be appending to the file, so a torn last line is only truncated
+        when ``truncate_torn`` is set by a caller holding the lock exclusively.
+        """
+        valid_bytes = offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if skip:
+                    skip -= 1
+                    valid_bytes += len(line)
+                    continue
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json_codec.loads(line)
+                except ValueError:
+                    break
+                with self._lock:
+                    self._add(entry['collection'], entry['record'])
+                valid_bytes += len(line)
+        if truncate_torn and valid_bytes != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return valid_bytes
+
+    def _catch_up(self, exclusive=False):
+        """Replay what other processes appended since ``_position``. Needs the file lock."""
+        seq, offset = self._position
+        compacted, segments = self._scan()
+        last = segments[-1] if segments else None
+        if seq in segments:
+            offset = self._replay(self._path('segment', seq), offset, truncate_torn=exclusive and seq == last)
+        elif compacted is not None and compacted >= seq:
+            # Another process merged our segment into compacted-N, which holds every
+            # line replayed so far as a prefix.
+            self._replay(self._path('compacted', compacted), skip=self._replayed)
+            seq, offset = compacted, 0
+        for later in [s for s in segments if s > seq]:
+            offset = self._replay(self._path('segment', later), truncate_torn=exclusive and later == last)
+            seq = later
+        self._position = (seq, offset)
+        with self._lock:
+            self._version = self._shared_version.read()
+
+    def _sync(self):
+        if self._shared_version.read() == self._version:
+            return
+        with self._file_lock.hold(exclusive=False):
+            if self._shared_version.read() != self._version:
+                self._catch_up()
+
+    def _open_segment(self, seq):
+        if self._active is not None:
+            self._active.close()
+        path = self._path('segment', seq)
+        self._active = open(path, 'ab')
+        self._active_seq = seq
+        self._active_size = os.path.getsize(path)
+
+    def _encode(self, collection, record):
+        entry = {'collection': collection, 'record': record}
+        return json_codec.dumps(entry) + b'\n'
+
+    def _add(self, collection, record):
+        position = self._tables[collection].append(record)
+        self._index.setdefault(record.get('id'), (collection, position))
+        self._replayed += 1
+
+    def import_document(self, document):
+        # Legacy files can hold same-second duplicate IDs; keep every record.
+        batch = [PendingWrite(collection, record)
+                 for collection in COLLECTIONS for record in document.get(collection, [])]
+        for start in range(0, len(batch), MAX_BATCH):
+            self._commit(batch[start:start + MAX_BATCH], check_duplicates=False)
+
+    def _commit(self, batch, check_duplicates=True):
+        with self._file_lock.hold():
+            # Nothing to replay unless another process committed, or died mid-write and left a torn tail.
+            if (self._shared_version.read() != self._version
+                    or os.fstat(self._active.fileno()).st_size != self._active_size):
+                self._catch_up(exclusive=True)
+                seq, offset = self._position
+                if seq != self._active_seq:
+                    # Another process started a new segment.
+                    self._open_segment(seq)
+                self._active_size = offset
+            if check_duplicates:
+                accepted = []
+                batch_ids = set()
+                for pending in batch:
+                    submission_id = pending.record.get('id')
+                    if submission_id in self._index or submission_id in batch_ids:
+                        pending.error = DuplicateSubmissionError(f'Duplicate submission id: {submission_id}')
+                        continue
+                    batch_ids.add(submission_id)
+                    accepted.append(pending)
+                batch = accepted
+            for pending in batch:
+                line = self._encode(pending.collection, pending.record)
+                if self._active_size and self._active_size + len(line) > self.segment_max_bytes:
+                    self._active.flush()
+                    os.fsync(self._active.fileno())
+                    self._open_segment(self._active_seq + 1)
+                    self._schedule_compaction()
+                self._active.write(line)
+                self._active_size += len(line)
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            self._position = (self._active_seq, self._active_size)
+            with self._lock:
+                for pending in batch:
+                    self._add(pending.collection, pending.record)
+                self._version = self._shared_version.bump()
+
+    def version(self):
+        self._sync()
+        return self._version
+
+    def aggregates(self):
+        self._sync()
+        return self._aggregates
+
+    def iter_records(self, collection, start=0):
+        # Tables only grow, so rows below the current length can be read
+        # without holding the lock.
+        self._sync()
+        table = self._tables[collection]
+        with self._lock:
+            end = len(table)
+        for position in range(start, end):
+            yield position, table.record(position)
+
+    def _table(self, collection):
+        self._sync()
+        table = self._tables[collection]
+        with self._lock:
+            return table, len(table)
+
+    # Scans filter and read the columns; records are only rebuilt for matches.
+    def iter_matching(self, collection, start, query):
+        table, end = self._table(collection)
+        for position in table.select(query, start, end):
+            yield position, table.record(position)
+
+    def data_fields(self, collection, query):
+        table, end = self._table(collection)
+        return table.data_keys(table.select(query, 0, end))
+
+    def iter_rows(self, collection, query, fields):
+        table, end = self._table(collection)
+        return table.rows(table.select(query, 0, end), fields)
+
+    def _lookup(self, submission_id):
+        self._sync()
+        with self._lock:
+            found = self._index.get(submission_id)
+            if found is None:
+                return None
+            collection, position = found
+            return collection, self._tables[collection].cached_record(position)
+
+    def load(self):
+        self._sync()
+        with self._lock:
+            ends = {collection: len(table) for collection, table in self._tables.items()}
+        return {collection: [table.record(position) for position in range(ends[collection])]
+                for collection, table in self._tables.items()}
+
+    def _sealed_segments(self):
+        compacted, segments = self._scan()
+        return compacted, [s for s in segments if s < self._active_seq]
+
+    def _schedule_compaction(self):
+        _, sealed = self._sealed_segments()
+        if len(sealed) < self.compact_after_segments:
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name='submission-log-compactor', daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        # Exclusive, so no other process is replaying the segments being removed.
+        with self._compact_lock, self._file_lock.hold():
+            compacted, sealed = self._sealed_segments()
+            if not sealed:
+                return
+            inputs = []
+            if compacted is not None:
+                inputs.append(self._path('compacted', compacted))
+            inputs.extend(self._path('segment', seq) for seq in sealed)
+
+            target = self._path('compacted', sealed[-1])
+            tmp = target + '.tmp'
+            with open(tmp, 'wb') as out:
+                for path in inputs:
+                    with open(path, 'rb') as f:
+                        for line in f:
+                            if line.endswith(b'\n'):
+                                out.write(line)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, target)
+            for path in inputs:
+                os.remove(path)
+
+    def close(self):
+        self._writer.stop()
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+        if self._compactor is not None:
+            self._compactor.join()
+        self._shared_version.close()
+
+
+def has_submission_log(log_dir=LOG_DIR):
+    """True if ``log_dir`` holds log segments, i.e. the log store has been in use."""
+    try:
+        return any(_SEGMENT_RE.match(name) for name in os.listdir(log_dir))
+    except FileNotFoundError:
+        return False
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_store(backend=None):
+    backend = backend or os.environ.get('SUBMISSION_STORE', 'log')
+    if backend == 'json':
+        return JSONFileStore()
+    if backend == 'log':
+        return LogSubmissionStore()
+    if backend == 'sqlite':
+        from models.sqlite_store import SQLiteSubmissionStore
+        return SQLiteSubmissionStore()
+    raise ValueError(f'Unknown submission store backend: {backend}')
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store()
+    return _store
+
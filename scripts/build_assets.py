@@ -0,0 +1,111 @@
+"""Build fingerprinted, precompressed copies of the site's static files.
+
+Usage: python scripts/build_assets.py [--out static_build]
+
+Images, stylesheets and scripts are copied as ``name.<hash>.ext`` and every
+reference to them in CSS, JS and HTML is rewritten. HTML pages keep their
+names. Text files also get ``.gz`` (and ``.br`` when the ``brotli`` package
+is installed) siblings. The mapping is written to ``asset-manifest.json``.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.static_assets import MANIFEST_NAME, STATIC_EXTENSIONS  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIRS = ('', 'svg')
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.svg'}
+# Leaf assets first, so that rewriting CSS/JS references happens before they are hashed.
+BUILD_ORDER = ('.svg', '.jpg', '.jpeg', '.png', '.webp', '.ico', '.css', '.js', '.html')
+
+
+def collect_sources():
+    sources = []
+    for directory in SOURCE_DIRS:
+        for name in sorted(os.listdir(os.path.join(ROOT, directory))):
+            relative = f'{directory}/{name}' if directory else name
+            if os.path.isfile(os.path.join(ROOT, relative)) and os.path.splitext(name)[1].lower() in STATIC_EXTENSIONS:
+                sources.append(relative)
+    return sorted(sources, key=lambda name: BUILD_ORDER.index(os.path.splitext(name)[1].lower()))
+
+
+def rewrite_references(content, assets):
+    for original, fingerprinted in assets.items():
+        pattern = re.compile(r'(["\'(])(\./)?' + re.escape(original) + r'(["\')?#])')
+        content = pattern.sub(lambda m: m.group(1) + (m.group(2) or '') + fingerprinted + m.group(3), content)
+    return content
+
+
+def write_compressed(path, payload):
+    saved = {}
+    gzipped = gzip.compress(payload, compresslevel=9, mtime=0)
+    if len(gzipped) < len(payload):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzipped)
+        saved['gzip'] = len(gzipped)
+    if brotli is not None:
+        compressed = brotli.compress(payload, quality=11)
+        if len(compressed) < len(payload):
+            with open(path + '.br', 'wb') as f:
+                f.write(compressed)
+            saved['br'] = len(compressed)
+    return saved
+
+
+def build(out_dir):
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    assets = {}
+    sizes = {}
+    for relative in collect_sources():
+        base, ext = os.path.splitext(relative)
+        with open(os.path.join(ROOT, relative), 'rb') as f:
+            payload = f.read()
+        if ext.lower() in ('.css', '.js', '.html'):
+            payload = rewrite_references(payload.decode('utf-8'), assets).encode('utf-8')
+
+        if ext.lower() == '.html':
+            target = relative
+        else:
+            target = f'{base}.{hashlib.sha256(payload).hexdigest()[:10]}{ext}'
+            assets[relative] = target
+
+        path = os.path.join(out_dir, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(payload)
+        sizes[target] = {'raw': len(payload)}
+        if ext.lower() in TEXT_EXTENSIONS:
+            sizes[target].update(write_compressed(path, payload))
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets, 'sizes': sizes}, f, indent=2)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--out', default=os.path.join(ROOT, os.environ.get('STATIC_BUILD_DIR', 'static_build')))
+    args = parser.parse_args()
+
+    sizes = build(args.out)
+    raw = sum(s['raw'] for s in sizes.values())
+    best = sum(min(s.values()) for s in sizes.values())
+    print(f'Built {len(sizes)} files into {args.out}: {raw} bytes raw, {best} bytes with the best encoding')
+
+
+if __name__ == '__main__':
+    main()
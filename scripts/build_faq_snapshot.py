@@ -0,0 +1,40 @@
+"""Prebuild the FAQ search indexes so the app does not build them at startup.
+
+Usage: python scripts/build_faq_snapshot.py [--faqs data/faqs.json] [--out data/faq_index] [--no-dense]
+
+Writes the FAQs and their BM25 index as one pickle, plus the dense matrix as
+``.npy`` files that are memory-mapped on the first dense search. The app
+only uses the snapshot while its digest matches the FAQ file, so an edited
+``faqs.json`` falls back to building the index from JSON until this runs
+again.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from controllers.faq_controller import FAQ_FILE, FAQ_SNAPSHOT_DIR  # noqa: E402
+from models.faq_index import faq_digest, save_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--faqs', default=os.path.join(ROOT, FAQ_FILE))
+    parser.add_argument('--out', default=os.path.join(ROOT, FAQ_SNAPSHOT_DIR))
+    parser.add_argument('--no-dense', action='store_true', help='skip the dense (numpy) matrix')
+    args = parser.parse_args()
+
+    with open(args.faqs, 'rb') as f:
+        payload = f.read()
+    faqs = json.loads(payload).get('faqs', [])
+    start = time.perf_counter()
+    path = save_snapshot(args.out, faqs, faq_digest(payload), dense=not args.no_dense)
+    print(f"Wrote {path} for {len(faqs)} FAQs in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
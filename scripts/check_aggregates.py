@@ -0,0 +1,28 @@
+"""Compare the store's maintained aggregates with a full recompute.
+
+Usage: python scripts/check_aggregates.py
+Exits non-zero if any counter differs.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.aggregates import check_consistency  # noqa: E402
+from models.submission_store import get_store  # noqa: E402
+
+
+def main():
+    store = get_store()
+    mismatches = check_consistency(store.aggregates(), store.load())
+    store.close()
+    if mismatches:
+        print(f'{len(mismatches)} aggregate mismatches:')
+        for mismatch in mismatches:
+            print('  ' + mismatch)
+        sys.exit(1)
+    print('Aggregates match a full recompute.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Copy every submission into the SQLite backend.
+
+Usage:
+  python scripts/migrate_to_sqlite.py                      # from the current store (SUBMISSION_STORE, default log)
+  python scripts/migrate_to_sqlite.py --source data/submissions.json
+  python scripts/migrate_to_sqlite.py --db data/submissions.db
+
+Refuses to write into a database that already holds submissions. After
+copying, the per-collection counts and every stats counter are compared with
+the source. Start the server with SUBMISSION_STORE=sqlite afterwards.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.aggregates import check_consistency  # noqa: E402
+from models.sqlite_store import SQLITE_FILE, SQLiteSubmissionStore  # noqa: E402
+from models.submission_store import COLLECTIONS, create_store  # noqa: E402
+
+
+def read_source(path):
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    backend = os.environ.get('SUBMISSION_STORE', 'log')
+    if backend == 'sqlite':
+        sys.exit('SUBMISSION_STORE is already sqlite; pass --source to migrate from a JSON file')
+    store = create_store(backend)
+    document = store.load()
+    store.close()
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', help='JSON file with contacts/services/internships lists')
+    parser.add_argument('--db', default=SQLITE_FILE)
+    args = parser.parse_args()
+
+    document = read_source(args.source)
+    store = SQLiteSubmissionStore(args.db, import_file=None, log_dir=None)
+    if store.version() is not None:
+        store.close()
+        sys.exit(f'{args.db} already has submissions; move it away to migrate again')
+
+    store.import_document(document)
+    counts = store.aggregates()
+    failed = False
+    for collection in COLLECTIONS:
+        expected = len(document.get(collection, []))
+        print(f'{collection:<12} source={expected:<8} sqlite={counts.total(collection)}')
+        failed = failed or expected != counts.total(collection)
+    mismatches = check_consistency(counts, document)
+    for mismatch in mismatches:
+        print('  ' + mismatch)
+    store.close()
+    if failed or mismatches:
+        sys.exit(1)
+    print(f'Migrated into {args.db}. Set SUBMISSION_STORE=sqlite to use it.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from models.columnar import RecordTable
+from utils.listing import ListingQuery
+
+VALUES = ['', 'web', 'mobile', None, 1, '1', 'None']
+
+
+def random_record(rng, i):
+    data = {}
+    for field in ('service', 'budget', 'message', 'company'):
+        if rng.random() < 0.8:
+            data[field] = rng.choice(VALUES)
+    record = {'id': f'r{i}', 'type': 'service_request',
+              'timestamp': f'2025-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}T10:00:00', 'data': data}
+    kind = rng.random()
+    if kind < 0.05:
+        record['extra'] = True
+    elif kind < 0.1:
+        data['service'] = ['unhashable']
+    elif kind < 0.15:
+        record = {'data': data, 'timestamp': record['timestamp'], 'id': record['id']}
+    return record
+
+
+@pytest.fixture
+def table():
+    rng = random.Random(5)
+    table = RecordTable()
+    records = [random_record(rng, i) for i in range(500)]
+    for record in records:
+        table.append(record)
+    return table, records
+
+
+def queries():
+    yield ListingQuery((), None, None, None, None, {}, False)
+    yield ListingQuery((), None, None, '2025-02-01', None, {}, False)
+    yield ListingQuery((), None, None, '2025-01-10', '2025-02', {}, False)
+    for field in ('service', 'message', 'missing'):
+        for value in ('', 'web', '1', 'None', "['unhashable']"):
+            yield ListingQuery((), None, None, None, None, {field: value}, False)
+    yield ListingQuery((), None, None, '2025-02', None, {'service': 'web', 'message': ''}, False)
+
+
+def test_select_agrees_with_matches(table):
+    table, records = table
+    for query in queries():
+        expected = [p for p, record in enumerate(records) if query.matches(record)]
+        assert list(table.select(query)) == expected
+        assert list(table.select(query, 100, 300)) == [p for p in expected if 100 <= p < 300]
+
+
+def test_rows_and_data_keys_read_the_columns(table):
+    table, records = table
+    query = ListingQuery((), None, None, '2025-02-01', None, {}, False)
+    positions = list(table.select(query))
+    fields = {}
+    for position in positions:
+        fields.update(dict.fromkeys(records[position]['data']))
+    assert table.data_keys(positions) == list(fields)
+
+    fields = list(fields) + ['missing']
+    rows = [(records[p].get('id'), records[p].get('type'), records[p].get('timestamp'))
+            + tuple(records[p]['data'].get(field) for field in fields) for p in positions]
+    assert list(table.rows(positions, fields)) == rows
+
+
+def test_records_round_trip(table):
+    table, records = table
+    assert [table.record(p) for p in range(len(records))] == records
+    assert table.cached_record(7) is table.cached_record(7)
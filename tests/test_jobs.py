@@ -0,0 +1,123 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import time
+
+import pytest
+
+from utils.jobs import Job, JobQueue
+from utils.notifications import StubNotificationSink
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def spool_files(spool_dir):
+    return sorted(name for name in os.listdir(spool_dir) if name != 'failed')
+
+
+def notifying_queue(spool_dir, sink, **kwargs):
+    queue = JobQueue(spool_dir, workers=1, **kwargs)
+    queue.register('notify', lambda payload: sink.send('subject', [], payload))
+    return queue
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    return str(tmp_path / 'spool')
+
+
+def test_failed_job_is_retried_until_it_succeeds(spool_dir):
+    sink = StubNotificationSink(fail_times=2)
+    queue = notifying_queue(spool_dir, sink, max_attempts=5, base_delay=0.01)
+    try:
+        queue.enqueue('notify', {'id': 'contact_1'})
+        assert wait_for(lambda: queue.completed == 1)
+    finally:
+        queue.shutdown()
+
+    assert queue.stats() == {'pending': 0, 'completed': 1, 'retried': 2, 'failed': 0}
+    assert [sent['submission_id'] for sent in sink.sent] == ['contact_1']
+    assert spool_files(spool_dir) == []
+
+
+def test_job_moves_to_failed_after_max_attempts(spool_dir):
+    sink = StubNotificationSink(fail_times=10)
+    queue = notifying_queue(spool_dir, sink, max_attempts=3, base_delay=0.01)
+    try:
+        job_id = queue.enqueue('notify', {'id': 'contact_1'})
+        assert wait_for(lambda: queue.failed == 1)
+    finally:
+        queue.shutdown()
+
+    assert queue.retried == 2
+    assert sink.sent == []
+    assert spool_files(spool_dir) == []
+    with open(os.path.join(spool_dir, 'failed', f'{job_id}.json'), encoding='utf-8') as f:
+        failed = json.load(f)
+    assert failed['attempts'] == 3
+    assert failed['payload'] == {'id': 'contact_1'}
+
+
+def test_spooled_jobs_are_replayed_on_restart(spool_dir):
+    os.makedirs(spool_dir)
+    pending = Job('notify', {'id': 'contact_pending'}, job_id='1-pending', attempts=1)
+    with open(os.path.join(spool_dir, '1-pending.json'), 'wb') as f:
+        f.write(pending.to_json())
+    # A job a process was running when it died.
+    dead = subprocess.Popen(['true'])
+    dead.wait()
+    orphan = Job('notify', {'id': 'contact_orphan'}, job_id='2-orphan')
+    with open(os.path.join(spool_dir, f'2-orphan.json.{dead.pid}.running'), 'wb') as f:
+        f.write(orphan.to_json())
+
+    sink = StubNotificationSink()
+    queue = notifying_queue(spool_dir, sink, base_delay=0.01)
+    try:
+        queue.enqueue('notify', {'id': 'contact_new'})
+        assert wait_for(lambda: queue.completed == 3)
+    finally:
+        queue.shutdown()
+
+    assert sorted(sent['submission_id'] for sent in sink.sent) == ['contact_new', 'contact_orphan',
+                                                                   'contact_pending']
+    assert spool_files(spool_dir) == []
+
+
+def replay_in_other_worker(spool_dir, results):
+    sink = StubNotificationSink()
+    queue = notifying_queue(spool_dir, sink, base_delay=0.01)
+    queue._ensure_started()
+    time.sleep(0.3)
+    queue.shutdown()
+    results.put(len(sink.sent))
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_job_waiting_for_retry_is_not_taken_by_another_worker(spool_dir):
+    sink = StubNotificationSink(fail_times=1)
+    queue = notifying_queue(spool_dir, sink, base_delay=1.0)
+    try:
+        queue.enqueue('notify', {'id': 'contact_1'})
+        assert wait_for(lambda: queue.retried == 1)
+        assert all(name.endswith(f'.{os.getpid()}.running') for name in spool_files(spool_dir))
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        worker = context.Process(target=replay_in_other_worker, args=(spool_dir, results))
+        worker.start()
+        worker.join(10)
+        assert results.get(timeout=5) == 0
+
+        assert wait_for(lambda: queue.completed == 1)
+    finally:
+        queue.shutdown()
+    assert [sent['submission_id'] for sent in sink.sent] == ['contact_1']
+    assert spool_files(spool_dir) == []
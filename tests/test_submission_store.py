@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from models.submission_store import LogSubmissionStore
+
+
+def contact(i, prefix='contact'):
+    return {
+        'id': f'{prefix}_{i}',
+        'type': 'contact',
+        'timestamp': f'2025-01-01T12:00:{i % 60:02d}',
+        'data': {'name': f'User {i}', 'email': f'user{i}@example.com', 'subject': 'general',
+                 'message': f'message {i}'}
+    }
+
+
+def contact_ids(store):
+    return [record['id'] for record in store.load()['contacts']]
+
+
+def log_files(log_dir, kind):
+    return sorted(name for name in os.listdir(log_dir) if name.startswith(kind))
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    return str(tmp_path / 'log')
+
+
+def open_store(log_dir, **kwargs):
+    return LogSubmissionStore(log_dir, import_file=None, **kwargs)
+
+
+def test_replay_drops_a_torn_last_record(log_dir):
+    store = open_store(log_dir)
+    for i in range(3):
+        store.append('contacts', contact(i))
+    store.close()
+
+    segment = os.path.join(log_dir, log_files(log_dir, 'segment')[-1])
+    size = os.path.getsize(segment)
+    with open(segment, 'ab') as f:
+        f.write(b'{"collection": "contacts", "record": {"id": "contact_torn"')
+
+    store = open_store(log_dir)
+    assert contact_ids(store) == ['contact_0', 'contact_1', 'contact_2']
+    assert os.path.getsize(segment) == size
+    store.append('contacts', contact(3))
+    store.close()
+
+    store = open_store(log_dir)
+    assert contact_ids(store) == ['contact_0', 'contact_1', 'contact_2', 'contact_3']
+    assert store.get('contacts', 'contact_3')['data']['message'] == 'message 3'
+    store.close()
+
+
+def test_records_read_back_after_compaction(log_dir):
+    store = open_store(log_dir, segment_max_bytes=400, compact_after_segments=1000)
+    for i in range(20):
+        store.append('contacts', contact(i))
+    assert len(log_files(log_dir, 'segment')) > 2
+
+    store.compact()
+    assert len(log_files(log_dir, 'compacted')) == 1
+    assert len(log_files(log_dir, 'segment')) == 1
+    expected = [f'contact_{i}' for i in range(20)]
+    assert contact_ids(store) == expected
+
+    store.append('contacts', contact(20))
+    store.close()
+
+    store = open_store(log_dir, segment_max_bytes=400, compact_after_segments=1000)
+    assert contact_ids(store) == expected + ['contact_20']
+    assert store.get('contacts', 'contact_7')['data']['name'] == 'User 7'
+    assert store.aggregates().total('contacts') == 21
+    store.close()
+
+
+def test_two_instances_see_each_others_writes(log_dir):
+    first = open_store(log_dir, segment_max_bytes=400, compact_after_segments=1000)
+    second = open_store(log_dir, segment_max_bytes=400, compact_after_segments=1000)
+
+    first.append('contacts', contact(0, 'first'))
+    assert second.get('contacts', 'first_0') is not None
+    second.append('contacts', contact(0, 'second'))
+    assert first.get('contacts', 'second_0') is not None
+    assert first.version() == second.version()
+
+    # Let the second instance fall behind across new segments and a compaction.
+    for i in range(1, 20):
+        first.append('contacts', contact(i, 'first'))
+    first.compact()
+    assert contact_ids(second) == contact_ids(first)
+    assert second.aggregates().total('contacts') == 21
+    first.close()
+    second.close()
+
+
+def write_from_process(log_dir, prefix, threads, posts):
+    store = open_store(log_dir, segment_max_bytes=2000, compact_after_segments=2)
+
+    def write(thread):
+        for i in range(posts):
+            store.append('contacts', contact(i, f'{prefix}_{thread}'))
+
+    workers = [threading.Thread(target=write, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store.close()
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_processes_sharing_a_log_lose_no_writes(log_dir):
+    store = open_store(log_dir, segment_max_bytes=2000, compact_after_segments=2)
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=write_from_process, args=(log_dir, f'p{n}', 4, 25))
+                 for n in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    ids = contact_ids(store)
+    assert len(ids) == 300
+    assert len(set(ids)) == 300
+    assert store.aggregates().total('contacts') == 300
+    store.close()
+
+    replayed = open_store(log_dir)
+    assert sorted(contact_ids(replayed)) == sorted(ids)
+    replayed.close()
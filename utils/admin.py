@@ -0,0 +1,15 @@
+import hmac
+import os
+
+from flask import request
+
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+
+def is_admin_request():
+    """True when the request carries ``X-Admin-Token`` matching ``ADMIN_TOKEN``.
+
+    Admin-only endpoints stay disabled while ``ADMIN_TOKEN`` is unset.
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
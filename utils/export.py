@@ -0,0 +1,132 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+
+from flask import Response, request, stream_with_context
+
+from utils import json_codec
+from utils.listing import ListingQuery, iter_matching, parse_collections, parse_filters
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+RECORD_COLUMNS = ('id', 'type', 'timestamp')
+_RECORD_COLUMN_SET = frozenset(RECORD_COLUMNS)
+# Rows are buffered into chunks of about this many bytes before they are sent.
+CHUNK_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+# Spreadsheet apps treat cells starting with these as formulas.
+FORMULA_PREFIXES = frozenset('=+-@\t\r')
+
+
+def parse_export_query(args):
+    """Return ``(query, format, gzip)`` for ``/api/submissions/export``."""
+    fmt = args.get('format', 'csv')
+    if fmt not in EXPORT_MIMETYPES:
+        raise ValueError('format must be csv or ndjson')
+    query = ListingQuery(parse_collections(args), None, None, args.get('since'), args.get('until'),
+                         parse_filters(args), True)
+    return query, fmt, args.get('gzip') == '1'
+
+
+def column_name(field):
+    return f'data.{field}' if field in RECORD_COLUMNS else field
+
+
+def flatten(record):
+    """One flat row: the record's id, type and timestamp followed by its form fields."""
+    row = {column: record.get(column, '') for column in RECORD_COLUMNS}
+    data = record.get('data', {})
+    if type(data) is dict and _RECORD_COLUMN_SET.isdisjoint(data):
+        row.update(data)
+        return row
+    for field, value in data.items():
+        row[column_name(field)] = value
+    return row
+
+
+def csv_cell(value):
+    if type(value) is str:
+        if value and value[0] in FORMULA_PREFIXES:
+            return "'" + value
+        return value
+    if isinstance(value, (list, dict)):
+        return csv_cell(json_codec.dumps(value).decode('utf-8'))
+    return value
+
+
+def data_fields(store, query):
+    # A first pass over the matches collects the form fields, so the header
+    # can be written before any row without holding the rows in memory.
+    fields = {}
+    for collection in query.collections:
+        fields.update(dict.fromkeys(store.data_fields(collection, query)))
+    return list(fields)
+
+
+def csv_chunks(store, query):
+    fields = data_fields(store, query)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(list(RECORD_COLUMNS) + [column_name(field) for field in fields])
+    for collection in query.collections:
+        for row in store.iter_rows(collection, query, fields):
+            writer.writerow([csv_cell(value) for value in row])
+            if buffer.tell() >= CHUNK_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def ndjson_chunks(store, query):
+    chunk = []
+    size = 0
+    for _, _, record in iter_matching(store, query):
+        line = json_codec.dumps(flatten(record)) + b'\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    yield b''.join(chunk)
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(store, query, fmt, gzip=False):
+    """Stream every matching submission as a CSV or NDJSON download.
+
+    Rows are produced by ``store.iter_rows`` (CSV) or ``store.iter_matching``
+    (NDJSON) and sent in chunks of about ``CHUNK_SIZE`` bytes, so memory use
+    does not grow with the number of submissions. With ``gzip`` the download is a ``.gz`` file; otherwise
+    the transfer is still gzipped on the fly when the client accepts it.
+    """
+    chunks = csv_chunks(store, query) if fmt == 'csv' else ndjson_chunks(store, query)
+    filename = f"submissions-{'-'.join(query.collections) or 'none'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    mimetype = EXPORT_MIMETYPES[fmt]
+    encoding = None
+    if gzip:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    elif 'gzip' in request.accept_encodings:
+        encoding = 'gzip'
+    if gzip or encoding:
+        chunks = gzip_chunks(chunks)
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
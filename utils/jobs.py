@@ -0,0 +1,241 @@
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from models.submission_store import DATA_DIR, atomic_write
+from utils import json_codec
+from utils.notifications import register_handlers
+
+SPOOL_DIR = os.path.join(DATA_DIR, 'spool')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_DELAY = float(os.environ.get('JOB_RETRY_BASE_DELAY', 2.0))
+
+
+class Job:
+    __slots__ = ('id', 'name', 'payload', 'attempts', 'path')
+
+    def __init__(self, name, payload, job_id=None, attempts=0, path=None):
+        self.id = job_id or f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+        self.name = name
+        self.payload = payload
+        self.attempts = attempts
+        self.path = path
+
+    def to_json(self):
+        return json_codec.dumps({'id': self.id, 'name': self.name, 'payload': self.payload,
+                                 'attempts': self.attempts})
+
+
+class JobQueue:
+    """In-process job queue backed by a spool directory.
+
+    Every job is written to ``spool_dir`` before it is queued, so work that
+    was pending when the process stopped is picked up again on the next
+    start. A job is claimed by renaming its file to ``<id>.json.<pid>.running``
+    before it runs, which keeps two processes sharing the spool from running
+    the same job. Failed jobs are retried with exponential backoff and moved
+    to ``failed/`` after ``max_attempts``; a job waiting for its retry keeps
+    its claim, so another worker replaying the spool cannot run it early.
+    """
+
+    def __init__(self, spool_dir=SPOOL_DIR, workers=JOB_WORKERS, max_attempts=JOB_MAX_ATTEMPTS,
+                 base_delay=JOB_RETRY_BASE_DELAY):
+        self.spool_dir = spool_dir
+        self.failed_dir = os.path.join(spool_dir, 'failed')
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.handlers = {}
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._pid = None
+        self._stopping = False
+        os.makedirs(self.failed_dir, exist_ok=True)
+
+    def register(self, name, handler):
+        self.handlers[name] = handler
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            # Worker threads do not survive a fork; start fresh ones per process.
+            self._pid = os.getpid()
+            self._heap = []
+            self._stopping = False
+            self._replay_spool()
+            self._threads = [threading.Thread(target=self._run, name=f'job-worker-{n}', daemon=True)
+                             for n in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+
+    def _replay_spool(self):
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            if name.endswith('.running'):
+                # Left behind by a process that died mid-job, or by this one
+                # before its workers were restarted with an empty queue.
+                pid = name.rsplit('.', 2)[-2]
+                if pid.isdigit() and int(pid) != os.getpid() and _process_alive(int(pid)):
+                    continue
+                pending = path[:-len('.running')].rsplit('.', 1)[0]
+                try:
+                    os.rename(path, pending)
+                except FileNotFoundError:
+                    continue
+                path = pending
+            elif not name.endswith('.json'):
+                continue
+            path = self._claim_path(path)
+            if path is None:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            job = Job(data['name'], data['payload'], data['id'], data.get('attempts', 0), path)
+            self._push(job, time.monotonic())
+
+    def _push(self, job, run_at):
+        heapq.heappush(self._heap, (run_at, next(self._sequence), job))
+        self._cond.notify()
+
+    def enqueue(self, name, payload):
+        if name not in self.handlers:
+            raise ValueError(f'No handler registered for job: {name}')
+        self._ensure_started()
+        job = Job(name, payload)
+        job.path = os.path.join(self.spool_dir, f'{job.id}.json')
+        try:
+            atomic_write(job.path, job.to_json())
+        except OSError as e:
+            job.path = None
+            print(f"❌ Could not spool job {name}, running it from memory only: {str(e)}")
+        with self._cond:
+            self._push(job, time.monotonic())
+        return job.id
+
+    def _next_job(self):
+        with self._cond:
+            while not self._stopping:
+                if self._heap:
+                    run_at = self._heap[0][0]
+                    delay = run_at - time.monotonic()
+                    if delay <= 0:
+                        return heapq.heappop(self._heap)[2]
+                    self._cond.wait(delay)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _claim_path(self, path):
+        claimed = f'{path}.{os.getpid()}.running'
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _claim(self, job):
+        if job.path is None or job.path.endswith(f'.{os.getpid()}.running'):
+            return True
+        claimed = self._claim_path(job.path)
+        if claimed is None:
+            return False
+        job.path = claimed
+        return True
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            if not self._claim(job):
+                continue
+            try:
+                self.handlers[job.name](job.payload)
+            except Exception as e:
+                self._handle_failure(job, e)
+            else:
+                self.completed += 1
+                if job.path is not None:
+                    os.remove(job.path)
+
+    def _handle_failure(self, job, error):
+        job.attempts += 1
+        if job.attempts >= self.max_attempts:
+            self.failed += 1
+            print(f"❌ Job {job.name} failed permanently after {job.attempts} attempts: {str(error)}")
+            if job.path is not None:
+                atomic_write(os.path.join(self.failed_dir, f'{job.id}.json'), job.to_json())
+                os.remove(job.path)
+            return
+
+        self.retried += 1
+        delay = self.base_delay * 2 ** (job.attempts - 1) * random.uniform(0.8, 1.2)
+        print(f"⚠️ Job {job.name} failed (attempt {job.attempts}), retrying in {delay:.1f}s: {str(error)}")
+        if job.path is not None:
+            # Stays claimed until the retry, but a restart replays it with the new attempt count.
+            atomic_write(job.path, job.to_json())
+        with self._cond:
+            self._push(job, time.monotonic() + delay)
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'completed': self.completed,
+            'retried': self.retried,
+            'failed': self.failed
+        }
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait and self._pid == os.getpid():
+            for thread in self._threads:
+                thread.join()
+        self._pid = None
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                job_queue = JobQueue()
+                register_handlers(job_queue)
+                _job_queue = job_queue
+    return _job_queue
@@ -0,0 +1,65 @@
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# "orjson" (default when installed) or "stdlib".
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson' if orjson is not None else 'stdlib')
+USE_ORJSON = orjson is not None and JSON_ENCODER == 'orjson'
+
+
+def dumps(obj, default=None, sort_keys=False, indent=False):
+    """Encode ``obj`` as compact UTF-8 JSON bytes (non-ASCII characters are kept as-is)."""
+    if USE_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if default is not None:
+            # Leave these to ``default`` so the output matches the stdlib path.
+            option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, default=default, sort_keys=sort_keys, ensure_ascii=False,
+                      indent=2 if indent else None,
+                      separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def loads(data):
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is available.
+
+    Output matches the default provider (sorted keys, compact unless in
+    debug mode, Flask's handling of dates and other types) except that
+    non-ASCII text is sent as UTF-8 instead of ``\\u`` escapes.
+    """
+
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if not USE_ORJSON or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, default=self.default, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if not USE_ORJSON or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not USE_ORJSON:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
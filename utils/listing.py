@@ -0,0 +1,147 @@
+from flask import Response, jsonify, stream_with_context
+
+from models.submission_store import COLLECTIONS
+from utils import json_codec
+from utils.metrics import STORE_SECONDS, timed
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+COLLECTION_ALIASES = {
+    'contacts': 'contacts',
+    'contact': 'contacts',
+    'services': 'services',
+    'service_request': 'services',
+    'internships': 'internships',
+    'internship_application': 'internships',
+}
+
+
+class ListingQuery:
+    """Pagination, filters and output format parsed from the query string.
+
+    ``after`` is the opaque ``next_cursor`` of the previous page
+    (``<collection>:<position>``). Filters: ``since``/``until`` compare against
+    the ISO timestamp and ``data.<field>=<value>`` matches a form field exactly.
+    """
+
+    def __init__(self, collections, limit, after, since, until, fields, stream):
+        self.collections = collections
+        self.limit = limit
+        self.after = after
+        self.since = since
+        self.until = until
+        self.fields = fields
+        self.stream = stream
+
+    def matches(self, record):
+        timestamp = record.get('timestamp', '')
+        if self.since and timestamp < self.since:
+            return False
+        if self.until and timestamp[:len(self.until)] > self.until:
+            return False
+        data = record.get('data', {})
+        for field, value in self.fields.items():
+            if str(data.get(field, '')) != value:
+                return False
+        return True
+
+
+def parse_collections(args, collections=COLLECTIONS):
+    """The collections picked by ``type`` (comma separated, aliases allowed)."""
+    if 'type' not in args:
+        return collections
+    requested = []
+    for name in args['type'].split(','):
+        if name.strip() not in COLLECTION_ALIASES:
+            raise ValueError(f'Unknown submission type: {name}')
+        requested.append(COLLECTION_ALIASES[name.strip()])
+    return tuple(c for c in collections if c in requested)
+
+
+def parse_filters(args):
+    """``data.<field>=<value>`` filters from the query string."""
+    return {key[len('data.'):]: value for key, value in args.items() if key.startswith('data.')}
+
+
+def parse_listing_query(args, collections=COLLECTIONS):
+    collections = parse_collections(args, collections)
+
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    after = None
+    if args.get('after'):
+        collection, _, position = args['after'].partition(':')
+        if collection not in COLLECTIONS or not position.isdigit():
+            raise ValueError('Invalid cursor')
+        after = (collection, int(position))
+
+    fmt = args.get('format', 'json')
+    if fmt not in ('json', 'ndjson'):
+        raise ValueError('format must be json or ndjson')
+
+    return ListingQuery(collections, min(limit, MAX_LIMIT), after,
+                        args.get('since'), args.get('until'), parse_filters(args), fmt == 'ndjson')
+
+
+def iter_matching(store, query):
+    """Yield ``(cursor, collection, record)`` for every match after the cursor."""
+    started = query.after is None
+    for collection in query.collections:
+        start = 0
+        if not started:
+            if collection != query.after[0]:
+                if COLLECTIONS.index(collection) < COLLECTIONS.index(query.after[0]):
+                    continue
+            else:
+                start = query.after[1] + 1
+            started = True
+        for position, record in store.iter_matching(collection, start, query):
+            yield f'{collection}:{position}', collection, record
+
+
+def fetch_page(store, query):
+    page = []
+    next_cursor = None
+    with timed(STORE_SECONDS, 'read'):
+        for cursor, collection, record in iter_matching(store, query):
+            if len(page) == query.limit:
+                next_cursor = page[-1][0]
+                break
+            page.append((cursor, collection, record))
+    return [(collection, record) for _, collection, record in page], next_cursor
+
+
+def ndjson_response(store, query):
+    def generate():
+        for _, _, record in iter_matching(store, query):
+            yield json_codec.dumps(record) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def collection_listing(store, collection, args):
+    """Response body for the per-type ``GET`` listing endpoints."""
+    try:
+        query = parse_listing_query(args, (collection,))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    if query.stream:
+        return ndjson_response(store, query)
+
+    page, next_cursor = fetch_page(store, query)
+    return jsonify({
+        'success': True,
+        'data': [record for _, record in page],
+        'count': len(page),
+        'total': store.aggregates().total(collection),
+        'next_cursor': next_cursor
+    })
@@ -0,0 +1,283 @@
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# With several worker processes, each one writes its totals here and a scrape adds them all up.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1))
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ShardOwner:
+    # Lives only in a thread's local storage, so it is freed when the thread ends.
+    __slots__ = ('__weakref__',)
+
+
+class Metric:
+    """Base for metrics whose hot path writes only to a per-thread shard.
+
+    Each thread updates its own dict without taking a lock; shards are merged
+    when ``/api/metrics`` is scraped. When a thread ends, its shard is folded
+    into ``_retired`` and dropped. The number of shards therefore follows the
+    number of live threads, not every thread the dev server ever started.
+    """
+
+    kind = None
+    # Whether a process that exited still counts towards the total across processes.
+    keep_after_exit = True
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        # Reentrant: a finalizer can run from garbage collection while the lock is held.
+        self._shards_lock = threading.RLock()
+        REGISTRY.append(self)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            owner = _ShardOwner()
+            self._local.shard = shard
+            self._local.owner = owner
+            with self._shards_lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard).atexit = False
+            _ensure_flusher()
+        return shard
+
+    def _reset_after_fork(self):
+        # The child starts from zero; what the parent recorded stays the parent's.
+        self._shards_lock = threading.RLock()
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+
+    def _retire(self, shard):
+        with self._shards_lock:
+            self._shards.pop(id(shard), None)
+            self._merge(self._retired, shard.items())
+
+    def _snapshot(self):
+        with self._shards_lock:
+            items = [list(shard.items()) for shard in self._shards.values()]
+            items.append(list(self._retired.items()))
+        return items
+
+    def collect(self):
+        merged = {}
+        for items in self._snapshot():
+            self._merge(merged, items)
+        return merged
+
+    def render(self, collected=None):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._render_samples(self.collect() if collected is None else collected))
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, *labels):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    @staticmethod
+    def _merge(merged, items):
+        for labels, value in items:
+            merged[labels] = merged.get(labels, 0) + value
+
+    def _render_samples(self, collected):
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}'
+                for labels, value in sorted(collected.items())]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+    keep_after_exit = False
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            shard[labels] = state
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _merge(self, merged, items):
+        for labels, (counts, total, count) in items:
+            entry = merged.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+            entry[2] += count
+
+    def _render_samples(self, collected):
+        lines = []
+        bounds = self.buckets + (float('inf'),)
+        for labels, (counts, total, count) in sorted(collected.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames, labels, [('le', _format_number(bound))])
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_number(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+@contextmanager
+def timed(histogram, *labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_process_snapshot(collected=None):
+    """Write this process's totals to ``METRICS_DIR/<pid>.json`` for the other workers' scrapes."""
+    if collected is None:
+        collected = {metric: metric.collect() for metric in REGISTRY}
+    snapshot = {metric.name: [[list(labels), value] for labels, value in samples.items()]
+                for metric, samples in collected.items()}
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def _other_process_snapshots():
+    for name in os.listdir(METRICS_DIR):
+        pid, _, extension = name.partition('.')
+        if extension != 'json' or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name), 'r', encoding='utf-8') as f:
+                yield _process_alive(int(pid)), json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def collect_all():
+    """Every metric's samples, added up over all processes sharing ``METRICS_DIR``."""
+    collected = {metric: metric.collect() for metric in REGISTRY}
+    if not METRICS_DIR:
+        return collected
+    write_process_snapshot(collected)
+    for alive, snapshot in _other_process_snapshots():
+        for metric, merged in collected.items():
+            if alive or metric.keep_after_exit:
+                metric._merge(merged, ((tuple(labels), value) for labels, value in snapshot.get(metric.name, ())))
+    return collected
+
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _ensure_flusher():
+    # Other workers only see this process's numbers as of its last flush.
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    def flush():
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            try:
+                write_process_snapshot()
+            except OSError as e:
+                print(f"❌ Could not write metrics snapshot: {str(e)}")
+
+    threading.Thread(target=flush, name='metrics-flusher', daemon=True).start()
+
+
+def _reset_after_fork():
+    global _flusher_pid, _flusher_lock
+    _flusher_pid = None
+    _flusher_lock = threading.Lock()
+    for metric in REGISTRY:
+        metric._reset_after_fork()
+
+
+if METRICS_DIR:
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def render_registry():
+    lines = []
+    for metric, collected in collect_all().items():
+        lines.extend(metric.render(collected))
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency by endpoint and status.',
+                            ('method', 'endpoint', 'status'))
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests currently being handled.')
+REQUEST_BYTES = Histogram('http_request_size_bytes', 'Request body size.', ('method', 'endpoint'), SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram('http_response_size_bytes', 'Response body size (unknown for streamed responses).',
+                           ('method', 'endpoint', 'status'), SIZE_BUCKETS)
+RATE_LIMITED = Counter('http_rate_limited_total', 'Requests rejected with 429 by endpoint.', ('endpoint',))
+STORE_SECONDS = Histogram('submission_store_operation_seconds', 'Submission store read, write and lookup time.',
+                          ('operation',))
+FAQ_SEARCH_SECONDS = Histogram('faq_search_duration_seconds', 'FAQ search time by mode and cache outcome.',
+                               ('mode', 'cache'))
@@ -0,0 +1,74 @@
+import os
+import threading
+
+NOTIFICATION_SINK = os.environ.get('NOTIFICATION_SINK', 'log')
+
+
+class NotificationSink:
+    def send(self, subject, body, submission):
+        raise NotImplementedError
+
+
+class LogNotificationSink(NotificationSink):
+    """Prints notifications to stdout; the default until email or webhooks are set up."""
+
+    def send(self, subject, body, submission):
+        print(subject)
+        for line in body:
+            print(f"   {line}")
+
+
+class StubNotificationSink(NotificationSink):
+    """Keeps notifications in memory for tests; ``fail_times`` makes the next sends raise."""
+
+    def __init__(self, fail_times=0):
+        self.sent = []
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def send(self, subject, body, submission):
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise RuntimeError('stub notification sink failure')
+            self.sent.append({'subject': subject, 'body': body, 'submission_id': submission['id']})
+
+
+def create_sink(name=NOTIFICATION_SINK):
+    if name == 'stub':
+        return StubNotificationSink()
+    if name == 'log':
+        return LogNotificationSink()
+    raise ValueError(f'Unknown notification sink: {name}')
+
+
+sink = create_sink()
+
+
+def describe_submission(collection, submission):
+    data = submission['data']
+    if collection == 'contacts':
+        return (f"📧 New contact submission from: {data['name']} ({data['email']})", [
+            f"Subject: {data['subject']}",
+            f"Urgency: {data.get('urgency') or 'Not specified'}",
+        ])
+    if collection == 'services':
+        return (f"🔧 New service request from: {data['name']} ({data['email']})", [
+            f"Service: {data['service']}",
+            f"Company: {data.get('company') or 'Not specified'}",
+            f"Budget: {data.get('budget') or 'Not specified'}",
+        ])
+    return (f"🎓 New internship application from: {data['name']} ({data['email']})", [
+        f"Area: {data['area']}",
+        f"Duration: {data['duration']}",
+        f"College: {data.get('college') or 'Not specified'}",
+    ])
+
+
+def handle_submission_created(payload):
+    subject, body = describe_submission(payload['collection'], payload['submission'])
+    sink.send(subject, body, payload['submission'])
+
+
+def register_handlers(job_queue):
+    job_queue.register('submission_created', handle_submission_created)
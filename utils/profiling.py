@@ -0,0 +1,122 @@
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+from models.submission_store import DATA_DIR
+from utils.admin import is_admin_request
+from utils.json_codec import FastJSONProvider
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(DATA_DIR, 'profiles'))
+# Fraction of hot-endpoint requests to profile without the admin header (0 disables, 1 profiles all).
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 200))
+PROFILE_HEADER = 'X-Profile'
+
+PROFILED_ENDPOINTS = {
+    'contact.submit_contact',
+    'services.submit_service_request',
+    'training.submit_internship_application',
+    'faq.search_faq',
+    'faq.search_faq_batch',
+    'get_stats',
+    'services.get_service_stats',
+    'training.get_internship_stats',
+}
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the ``Server-Timing`` phase ``name``.
+
+    Does nothing unless the current request is being profiled.
+    """
+    timings = g.get('server_timing') if has_request_context() else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """The app's JSON provider, with ``jsonify`` counted as the ``serialize`` phase."""
+
+    def response(self, *args, **kwargs):
+        with phase('serialize'):
+            return super().response(*args, **kwargs)
+
+
+class RequestProfiler:
+    """Wraps selected requests in cProfile and reports their phases.
+
+    A request to one of ``PROFILED_ENDPOINTS`` is profiled when it is picked
+    by ``PROFILE_SAMPLE_RATE`` or when an admin sends ``X-Profile: 1``. Each
+    profile is written to ``profile_dir`` as a ``.prof`` file (readable with
+    ``pstats``, snakeviz or flameprof) and only the newest ``keep`` are kept.
+    """
+
+    def __init__(self, profile_dir=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, keep=PROFILE_KEEP):
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def wanted(self):
+        if request.endpoint not in PROFILED_ENDPOINTS:
+            return False
+        if request.headers.get(PROFILE_HEADER) == '1' and is_admin_request():
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        if not self.wanted():
+            return
+        g.server_timing = {}
+        g.profile_started = time.perf_counter()
+        profiler = cProfile.Profile()
+        g.profiler = profiler
+        profiler.enable()
+
+    def finish(self, response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        total = time.perf_counter() - g.pop('profile_started')
+        timings = g.pop('server_timing')
+        parts = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.items()]
+        parts.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(parts)
+        try:
+            self._dump(profiler)
+        except OSError as e:
+            print(f"⚠️ Could not write request profile: {str(e)}")
+        return response
+
+    def abandon(self):
+        # Teardown after an error that skipped finish(); never leave a profiler running on the thread.
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+    def _dump(self, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unknown')
+        name = f'{time.time_ns()}-{os.getpid()}-{request.method}-{endpoint}.prof'
+        profiler.dump_stats(os.path.join(self.profile_dir, name))
+        with self._lock:
+            self.written += 1
+            profiles = sorted(f for f in os.listdir(self.profile_dir) if f.endswith('.prof'))
+            for old in profiles[:max(0, len(profiles) - self.keep)]:
+                try:
+                    os.remove(os.path.join(self.profile_dir, old))
+                except FileNotFoundError:
+                    pass
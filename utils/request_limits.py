@@ -0,0 +1,141 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import abort, jsonify, request
+
+from utils.metrics import RATE_LIMITED
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', 10000))
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024))
+DEFAULT_FIELD_LENGTH = 500
+
+
+class Quota:
+    __slots__ = ('name', 'per_minute', 'burst')
+
+    def __init__(self, name, per_minute, burst):
+        self.name = name
+        self.per_minute = per_minute
+        self.burst = burst
+
+
+SUBMIT_QUOTA = Quota('submit', float(os.environ.get('SUBMIT_RATE_PER_MINUTE', 5)),
+                     int(os.environ.get('SUBMIT_RATE_BURST', 5)))
+SEARCH_QUOTA = Quota('search', float(os.environ.get('SEARCH_RATE_PER_MINUTE', 60)),
+                     int(os.environ.get('SEARCH_RATE_BURST', 20)))
+# Autocomplete is called as the user types, so it gets a far larger quota than search.
+AUTOCOMPLETE_QUOTA = Quota('autocomplete', float(os.environ.get('AUTOCOMPLETE_RATE_PER_MINUTE', 600)),
+                           int(os.environ.get('AUTOCOMPLETE_RATE_BURST', 60)))
+EXPORT_QUOTA = Quota('export', float(os.environ.get('EXPORT_RATE_PER_MINUTE', 6)),
+                     int(os.environ.get('EXPORT_RATE_BURST', 3)))
+
+# Endpoint name -> quota. Routes that share a quota share one bucket per client.
+ROUTE_QUOTAS = {
+    'contact.submit_contact': SUBMIT_QUOTA,
+    'services.submit_service_request': SUBMIT_QUOTA,
+    'training.submit_internship_application': SUBMIT_QUOTA,
+    'faq.search_faq': SEARCH_QUOTA,
+    'faq.search_faq_batch': SEARCH_QUOTA,
+    'faq.autocomplete_faq': AUTOCOMPLETE_QUOTA,
+    'export_submissions': EXPORT_QUOTA,
+}
+
+# Longest accepted value per JSON body field; anything not listed gets DEFAULT_FIELD_LENGTH.
+FIELD_LENGTHS = {
+    'message': 5000,
+    'project-details': 5000,
+    'motivation': 3000,
+    'skills': 1000,
+}
+
+
+class TokenBucketLimiter:
+    """Token buckets per ``(quota, client)`` with a bounded number of buckets.
+
+    A bucket holds up to ``burst`` tokens and refills at ``per_minute / 60``
+    tokens per second. Buckets are kept in LRU order and the least recently
+    seen clients are dropped beyond ``max_clients``; a dropped client simply
+    starts again with a full bucket.
+    """
+
+    def __init__(self, max_clients=RATE_LIMIT_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, quota, client):
+        """Take one token; return 0 when allowed, else the seconds until one is available."""
+        key = (quota.name, client)
+        rate = quota.per_minute / 60.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(quota.burst), now]
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(quota.burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / rate if rate > 0 else float('inf')
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+def field_length_error(data):
+    """Return an error message for the first over-long field in ``data``, or None."""
+    if not isinstance(data, dict):
+        return None
+    for field, value in data.items():
+        limit = FIELD_LENGTHS.get(field, DEFAULT_FIELD_LENGTH)
+        if isinstance(value, str) and len(value) > limit:
+            return f'Field too long: {field} (max {limit} characters)'
+    return None
+
+
+limiter = TokenBucketLimiter()
+
+
+def enforce_request_limits():
+    """``before_request`` hook for the rate-limited routes; returns a response to reject the request."""
+    quota = ROUTE_QUOTAS.get(request.endpoint)
+    if quota is None:
+        return None
+
+    if RATE_LIMIT_ENABLED:
+        retry_after = limiter.hit(quota, request.remote_addr or 'unknown')
+        if retry_after:
+            RATE_LIMITED.inc(1, request.endpoint)
+            response = jsonify({
+                'success': False,
+                'error': 'Too many requests',
+                'message': 'Please wait a moment before trying again'
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+
+    # Read the body here so an oversized upload is rejected with 413 before
+    # the view's own error handling sees it. Chunked bodies have no
+    # Content-Length and are cut off at the limit instead of raising.
+    body = request.get_data(cache=True)
+    if request.content_length is None and len(body) >= MAX_CONTENT_LENGTH:
+        abort(413)
+    error = field_length_error(request.get_json(silent=True))
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    return None
@@ -0,0 +1,54 @@
+import hashlib
+import os
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from models.submission_store import get_store
+from utils.ttl_cache import TTLCache
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+# Only a safety net: entries are keyed by data version and never go stale on their own.
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+
+response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+def submissions_version():
+    # Stats include "recent" counts for today, so the day is part of the version.
+    return get_store().version(), datetime.now().strftime("%Y-%m-%d")
+
+
+def cached_response(version):
+    """Cache a view's serialized ``200`` JSON body under ``version()``.
+
+    The ETag is a hash of the body, computed once when the entry is built.
+    Versions only key the cache and may restart in a new process, so they
+    are kept out of the ETag. Identical content gets the same ETag from
+    every worker and every deploy, and changed content never shares one. A
+    client sending ``If-None-Match`` gets ``304`` without the view running
+    or anything being serialized. Entries for an old version are never
+    read again and age out of the LRU.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.endpoint, tuple(sorted(kwargs.items())), version())
+            entry = response_cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                entry = (etag, body, response.mimetype)
+                response_cache.set(key, entry)
+
+            etag, body, mimetype = entry
+            response = current_app.response_class(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+STATIC_EXTENSIONS = {'.html', '.css', '.js', '.svg', '.jpg', '.jpeg', '.png', '.webp', '.ico'}
+MANIFEST_NAME = 'asset-manifest.json'
+# Preferred first; each is only used when the build step wrote that file.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+class StaticAssets:
+    """Serves site files with strong ETags, precompressed variants and cache headers.
+
+    When ``scripts/build_assets.py`` has produced ``build_dir``, files are
+    served from there: fingerprinted assets are cached for a year and HTML
+    pages (which reference them) are revalidated on every load. Without a
+    build, the source files are served with ETags only.
+    """
+
+    def __init__(self, source_dir, build_dir):
+        self.source_dir = os.path.abspath(source_dir)
+        self.build_dir = os.path.abspath(build_dir)
+        self.fingerprinted = set()
+        manifest_path = os.path.join(self.build_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.fingerprinted = set(json.load(f)['assets'].values())
+        else:
+            self.build_dir = None
+        self._etags = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, filename):
+        if os.path.splitext(filename)[1].lower() not in STATIC_EXTENSIONS:
+            return None
+        for directory in (self.build_dir, self.source_dir):
+            if directory is None:
+                continue
+            path = safe_join(directory, filename)
+            if path is not None and os.path.isfile(path):
+                return path
+        return None
+
+    def etag(self, path, stat):
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._etags.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        etag = digest.hexdigest()[:32]
+        with self._lock:
+            self._etags[path] = (key, etag)
+        return etag
+
+    def send(self, filename):
+        path = self.resolve(filename)
+        if path is None:
+            abort(404)
+
+        encoding = None
+        served_path = path
+        for name, suffix in ENCODINGS:
+            if request.accept_encodings[name] and os.path.isfile(path + suffix):
+                encoding = name
+                served_path = path + suffix
+                break
+
+        stat = os.stat(served_path)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(served_path, mimetype=mimetype, etag=self.etag(served_path, stat),
+                             last_modified=stat.st_mtime, conditional=True, max_age=None)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        immutable = filename in self.fingerprinted
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        return response
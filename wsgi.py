@@ -0,0 +1,15 @@
+from app import app
+from models.submission_store import get_store
+
+# Replay the submission log and build the stats counters before gunicorn
+# forks, so workers start with them already in memory.
+get_store().aggregates()
+
+# Same for the FAQ index (from the prebuilt snapshot when there is one).
+try:
+    from controllers.faq_controller import get_rag_model
+    get_rag_model()
+except ImportError:
+    pass
+
+application = app